@@ -6,6 +6,16 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 engine = create_engine(
-    DATABASE_URL, pool_pre_ping=True, future=True
+    DATABASE_URL,
+    pool_pre_ping=True,
+    # Keep enough warm connections for concurrent requests instead of the
+    # default 5, and allow temporary bursts beyond that
+    pool_size=20,
+    max_overflow=20,
+    # Recycle connections before typical server/proxy idle timeouts, and
+    # prefer recently used connections so the pool can shrink when quiet
+    pool_recycle=1800,
+    pool_use_lifo=True,
+    future=True,
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
@@ -40,4 +40,6 @@ class PlayerInventoryLedger(Base):
     __table_args__ = (
         Index("ix_pil_user_item_time", "user_id", "item_id", "timestamp"),
         Index("ix_pil_struct_time", "structure_id", "timestamp"),
+        # Serves the ledger keyset pagination (timestamp DESC, id DESC per user)
+        Index("ix_pil_user_struct_time_id", "user_id", "structure_id", "timestamp", "id"),
     )
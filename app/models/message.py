@@ -41,7 +41,7 @@ class MessageRecipientStatus(Base):
 
     message_id = Column(Integer, ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-    status = Column(String(16), nullable=False, server_default="QUEUED")  # QUEUED|FAILED|ACKED
+    status = Column(String(16), nullable=False, server_default="QUEUED")  # QUEUED|DELIVERING|FAILED|ACKED
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     attempt_count = Column(Integer, nullable=False, server_default="0")
 
@@ -3,6 +3,7 @@ from sqlalchemy import (
     Column, Integer, String, Text, DateTime, ForeignKey,
     UniqueConstraint
 )
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -18,6 +19,7 @@ class Party(Base):
 
     leader_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
+    members = relationship("PartyMember", back_populates="party", passive_deletes=True)
 
     __table_args__ = (
         UniqueConstraint("structure_id", "name", name="uq_parties_struct_name"),
@@ -29,3 +31,6 @@ class PartyMember(Base):
     party_id = Column(Integer, ForeignKey("parties.id", ondelete="CASCADE"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     added_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    party = relationship("Party", back_populates="members")
+    user = relationship("User", foreign_keys=[user_id])
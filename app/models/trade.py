@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -22,5 +22,11 @@ class Trade(Base):
         passive_deletes=True,
     )
 
+    # list_trades filters on structure and orders newest-first; the composite
+    # lets one index serve both
+    __table_args__ = (
+        Index("ix_trade_struct_ts", "structure_id", text("timestamp DESC")),
+    )
+
     def __repr__(self) -> str:
         return f"<Trade id={self.id} structure={self.structure_id} user={self.user_id} ts={self.timestamp}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Table, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -26,7 +26,15 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     last_login = Column(DateTime(timezone=True), nullable=True)
 
+    # Structure member listings filter on both columns together
+    __table_args__ = (
+        Index("ix_user_struct_status", "structure_id", "membership_status"),
+    )
+
     # Relationships
-    roles = relationship("Role", secondary=user_roles, back_populates="users", lazy="joined")
+    # selectin avoids duplicating user rows per role in every query that
+    # touches User; roles load as one extra IN query only when needed.
+    roles = relationship("Role", secondary=user_roles, back_populates="users", lazy="selectin")
     trades = relationship("Trade", back_populates="user")
     structure = relationship("Structure", foreign_keys=[structure_id])
+    profile = relationship("UserProfile", uselist=False)
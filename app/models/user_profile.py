@@ -7,5 +7,6 @@ class UserProfile(Base):
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     discord_username = Column(String(64), nullable=True)
+    minecraft_username = Column(String(64), nullable=True)
     notes = Column(String(1024), nullable=True)
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
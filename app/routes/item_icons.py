@@ -2,20 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
-from app.services.deps import get_current_user, require_perm
+from app.services.deps import get_db, get_current_user, require_perm
 from app.models.user import User
 from app.models.item import Item
 
 router = APIRouter(prefix="/items", tags=["items"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/{item_id}/icon", dependencies=[Depends(require_perm("items.manage"))])
 async def upload_item_icon(
     item_id: int,
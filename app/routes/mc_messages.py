@@ -5,7 +5,7 @@ from typing import List, Dict
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select, update
 from typing import Optional, Tuple
 
 from app.services import mc_policy
@@ -27,25 +27,62 @@ router = APIRouter(prefix="/mc", tags=["mc"])
 @router.get("/messages", response_model=List[MCMessage])
 def pull_messages(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     now = datetime.now(timezone.utc)
-    rows = (
-        db.query(Message)
-        .join(
-            MessageRecipientStatus,
-            and_(
-                MessageRecipientStatus.message_id == Message.id,
-                MessageRecipientStatus.user_id == current_user.id,
-            ),
-        )
+    # Fast path: most polls find nothing to deliver. A single probe on the
+    # (user_id, status) index is much cheaper than the claim query below.
+    has_any = (
+        db.query(MessageRecipientStatus.user_id)
         .filter(
-            Message.structure_id == current_user.structure_id,
+            MessageRecipientStatus.user_id == current_user.id,
+            MessageRecipientStatus.status.in_(["QUEUED", "FAILED"]),
+        )
+        .limit(1)
+        .first()
+    )
+    if not has_any:
+        return []
+
+    # Atomically claim up to 100 deliverable rows: SKIP LOCKED keeps
+    # concurrent polls from grabbing the same messages, and the
+    # UPDATE ... RETURNING moves them QUEUED/FAILED -> DELIVERING and fetches
+    # the message columns in one round-trip (implicit ack on pull).
+    claim = (
+        select(MessageRecipientStatus.message_id)
+        .join(Message, Message.id == MessageRecipientStatus.message_id)
+        .where(
+            MessageRecipientStatus.user_id == current_user.id,
             MessageRecipientStatus.status.in_(["QUEUED", "FAILED"]),
+            Message.structure_id == current_user.structure_id,
             (Message.deliver_after.is_(None) | (Message.deliver_after <= now)),
             (Message.expires_at.is_(None) | (Message.expires_at > now)),
         )
         .order_by(Message.priority.desc(), Message.id.asc())
         .limit(100)
-        .all()
+        .with_for_update(skip_locked=True, of=MessageRecipientStatus)
     )
+    rows = db.execute(
+        update(MessageRecipientStatus)
+        .where(
+            MessageRecipientStatus.user_id == current_user.id,
+            MessageRecipientStatus.message_id.in_(claim),
+            Message.id == MessageRecipientStatus.message_id,
+        )
+        .values(status="DELIVERING", updated_at=now)
+        .returning(
+            Message.id,
+            Message.text,
+            Message.kind,
+            Message.meta,
+            Message.expires_at,
+            Message.priority,
+            Message.created_at,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+
+    # UPDATE ... RETURNING has no ORDER BY; restore delivery order in Python.
+    rows = sorted(rows, key=lambda r: r.id)
+    rows.sort(key=lambda r: r.priority, reverse=True)
 
     # Resolve positions in batch (by kind) for this structure
     kinds: List[str] = list({r.kind for r in rows})
@@ -208,34 +245,27 @@ def create_mc_trade(
     header_from_loc = loc.id if payload.direction == "TO" else None
     header_to_loc   = loc.id if payload.direction == "FROM" else None
 
+    # Direction, reason and the user parties are the same for every line of
+    # the trade; resolve them once instead of per item.
+    is_from = payload.direction == "FROM"
+    dir_lbl = "GAINED" if is_from else "GIVEN"   # player -> location : location -> player
+    reason  = _maybe_reason(db, structure_id, dir_lbl)
+    from_user_id = trader.id if is_from else None
+    to_user_id   = None if is_from else trader.id
+
+    # model_construct skips per-field validation; these values are built here
+    # from already-validated internals, not from client input.
     lines: list[TradeLineIn] = []
     for item_in in payload.items:
         it = _find_or_create_item(db, current_user.id, item_in.name, item_in.code)
-        if payload.direction == "FROM":
-            # player -> location
-            dir_lbl = "GAINED"
-            reason  = _maybe_reason(db, structure_id, dir_lbl)
-            ln = TradeLineIn(
-                item_id=it.id,
-                direction=dir_lbl,
-                quantity=item_in.amount,
-                from_user_id=trader.id,
-                to_user_id=None,
-                movement_reason_code=reason,
-            )
-        else:
-            # location -> player
-            dir_lbl = "GIVEN"
-            reason  = _maybe_reason(db, structure_id, dir_lbl)
-            ln = TradeLineIn(
-                item_id=it.id,
-                direction=dir_lbl,
-                quantity=item_in.amount,
-                from_user_id=None,
-                to_user_id=trader.id,
-                movement_reason_code=reason,
-            )
-        lines.append(ln)
+        lines.append(TradeLineIn.model_construct(
+            item_id=it.id,
+            direction=dir_lbl,
+            quantity=item_in.amount,
+            from_user_id=from_user_id,
+            to_user_id=to_user_id,
+            movement_reason_code=reason,
+        ))
 
     tc = TradeCreate(
         timestamp=datetime.now(timezone.utc),
@@ -5,7 +5,6 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, select
-from sqlalchemy import func, select, Integer, cast
 
 from app.services.deps import get_db, require_perm, get_current_user
 from app.models.user import User
@@ -65,14 +64,19 @@ def broadcast_to_structure(
 
 @router.post("/outbox", response_model=MessageCreatedOut, status_code=201)
 def send_message(payload: MessageCreate, db: Session = Depends(get_db), user: User = Depends(send_perm)):
+    # Deduplicate targets once up front; reused for validation, targets and
+    # recipient expansion below.
+    party_ids = set(payload.to_party_ids or [])
+    user_ids = set(payload.to_user_ids or [])
+
     # validate party ids & user ids belong to same structure
-    if payload.to_party_ids:
-        part_cnt = db.query(Party).filter(Party.id.in_(payload.to_party_ids), Party.structure_id == user.structure_id).count()
-        if part_cnt != len(set(payload.to_party_ids)):
+    if party_ids:
+        part_cnt = db.query(Party).filter(Party.id.in_(party_ids), Party.structure_id == user.structure_id).count()
+        if part_cnt != len(party_ids):
             raise HTTPException(status_code=400, detail="Some parties do not belong to this structure")
-    if payload.to_user_ids:
-        usr_cnt = db.query(User).filter(User.id.in_(payload.to_user_ids), User.structure_id == user.structure_id).count()
-        if usr_cnt != len(set(payload.to_user_ids)):
+    if user_ids:
+        usr_cnt = db.query(User).filter(User.id.in_(user_ids), User.structure_id == user.structure_id).count()
+        if usr_cnt != len(user_ids):
             raise HTTPException(status_code=400, detail="Some users do not belong to this structure")
 
     msg = Message(
@@ -90,18 +94,18 @@ def send_message(payload: MessageCreate, db: Session = Depends(get_db), user: Us
     db.flush()  # get msg.id
 
     # targets
-    for pid in set(payload.to_party_ids or []):
+    for pid in party_ids:
         db.add(MessageTarget(message_id=msg.id, party_id=pid))
-    for uid in set(payload.to_user_ids or []):
+    for uid in user_ids:
         db.add(MessageTarget(message_id=msg.id, user_id=uid))
 
     # expand recipients -> MessageRecipientStatus
-    recipient_user_ids: set[int] = set(payload.to_user_ids or [])
-    if payload.to_party_ids:
+    recipient_user_ids: set[int] = set(user_ids)
+    if party_ids:
         rows = (
             db.query(PartyMember.user_id)
             .join(Party, Party.id == PartyMember.party_id)
-            .filter(Party.id.in_(payload.to_party_ids), Party.structure_id == user.structure_id)
+            .filter(Party.id.in_(party_ids), Party.structure_id == user.structure_id)
             .all()
         )
         recipient_user_ids.update([r.user_id for r in rows])
@@ -123,6 +127,16 @@ def list_outbox(
     db: Session = Depends(get_db),
     user: User = Depends(view_perm),
 ):
+    # Pick the page of message ids first, then aggregate recipient statuses
+    # only for those ids -- keeps the GROUP BY bounded by the page size
+    # instead of scanning every recipient row in the structure.
+    top = (
+        select(Message.id)
+        .where(Message.structure_id == user.structure_id)
+        .order_by(Message.id.desc())
+        .limit(limit)
+        .cte("top")
+    )
     rows = (
         db.query(
             Message.id,
@@ -132,15 +146,14 @@ def list_outbox(
             Message.deliver_after,
             Message.expires_at,
             func.count(MessageRecipientStatus.user_id).label("total"),
-            func.sum(cast(MessageRecipientStatus.status == "QUEUED", Integer)).label("queued"),
-            func.sum(cast(MessageRecipientStatus.status == "FAILED", Integer)).label("failed"),
-            func.sum(cast(MessageRecipientStatus.status == "ACKED", Integer)).label("acked"),
+            func.count().filter(MessageRecipientStatus.status == "QUEUED").label("queued"),
+            func.count().filter(MessageRecipientStatus.status == "FAILED").label("failed"),
+            func.count().filter(MessageRecipientStatus.status == "ACKED").label("acked"),
         )
         .outerjoin(MessageRecipientStatus, MessageRecipientStatus.message_id == Message.id)
-        .filter(Message.structure_id == user.structure_id)
+        .filter(Message.id.in_(select(top.c.id)))
         .group_by(Message.id)
         .order_by(Message.id.desc())
-        .limit(limit)
         .all()
     )
     return [
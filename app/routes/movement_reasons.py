@@ -2,21 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.core.database import SessionLocal
-from app.services.deps import get_current_user, require_perm
+from app.services.deps import get_db, get_current_user, require_perm
 from app.models.user import User
 from app.models.movement_reason import MovementReason
 from app.schemas.movement_reason import MovementReasonIn, MovementReasonOut
 
 router = APIRouter(prefix="/movement-reasons", tags=["movement-reasons"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=List[MovementReasonOut])
 def list_reasons(
     active_only: bool = Query(True),
@@ -56,8 +48,10 @@ def create_reason(
         name=body.name,
         is_active=body.is_active,
     )
-    db.add(row); db.commit(); db.refresh(row)
-    return MovementReasonOut(structure_id=row.structure_id, code=row.code, name=row.name, is_active=row.is_active)
+    db.add(row); db.commit()
+    # Commit expires the row's attributes; every returned field came from the
+    # request, so build the response from it instead of re-reading the row
+    return MovementReasonOut(structure_id=current.structure_id, code=body.code, name=body.name, is_active=body.is_active)
 
 @router.patch("/{code}", response_model=MovementReasonOut, dependencies=[Depends(require_perm("movement_reasons.manage"))])
 def update_reason(
@@ -87,5 +81,6 @@ def update_reason(
 
     row.name = body.name
     row.is_active = body.is_active
-    db.commit(); db.refresh(row)
-    return MovementReasonOut(structure_id=row.structure_id, code=row.code, name=row.name, is_active=row.is_active)
+    db.commit()
+    # As above: reading row.* here would trigger an expired-attribute SELECT
+    return MovementReasonOut(structure_id=current.structure_id, code=body.code, name=body.name, is_active=body.is_active)
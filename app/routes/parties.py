@@ -2,16 +2,17 @@
 from __future__ import annotations
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.user_profile import UserProfile
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from app.models import Message, MessageTarget, MessageRecipientStatus
 from app.schemas.message import PartyMessageCreate, MessageCreatedOut
 from app.services.deps import get_db, require_perm, get_current_user
 from app.models.user import User
 from app.models.party import Party, PartyMember
-from app.schemas.party import PartyIn, PartyOut, PartyListOut, PartyMembersIn, PartyLeaderIn, PartyMeOut, \
-    PartyMemberView
+from app.schemas.party import PartyIn, PartyOut, PartyDetailOut, PartyMembersIn, PartyLeaderIn
 
 router = APIRouter(prefix="/parties", tags=["parties"])
 manage_parties = require_perm("users.admin")  # or "parties.manage" if you granted it
@@ -19,7 +20,7 @@ manage_parties = require_perm("users.admin")  # or "parties.manage" if you grant
 
 
 # ---------- NEW: user-facing endpoint ----------
-@router.get("/me", response_model=List[PartyMeOut])
+@router.get("/me", response_class=ORJSONResponse)
 def my_parties(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
@@ -28,7 +29,9 @@ def my_parties(
     Returns all parties the current user is a member of,
     including members' Minecraft usernames and the leader.
     """
-    # Find parties where the caller is a member, scoped by structure
+    # Find parties where the caller is a member, scoped by structure, with
+    # members (+ user/profile) eager-loaded instead of rebuilding the join
+    # in Python from a second query.
     parties: List[Party] = (
         db.query(Party)
         .join(PartyMember, PartyMember.party_id == Party.id)
@@ -36,90 +39,71 @@ def my_parties(
             PartyMember.user_id == user.id,
             Party.structure_id == user.structure_id
         )
-        .order_by(Party.name.asc())
-        .all()
-    )
-    if not parties:
-        return []
-
-    party_ids = [p.id for p in parties]
-
-    # Fetch all members for those parties in one query
-    # NOTE: adjust 'User.minecraft_username' -> 'User.mc_username' if that's your column name.
-    rows = (
-        db.query(
-            PartyMember.party_id,
-            User.id.label("user_id"),
-            User.username.label("username"),
-            UserProfile.minecraft_username.label("minecraft_username"),  # <- from profile
+        .options(
+            selectinload(Party.members).joinedload(PartyMember.user).joinedload(User.profile),
+            # Everything this handler needs is eager-loaded above; any other
+            # relationship access is a bug and should fail loudly rather than
+            # silently emit N+1 lazy loads.
+            raiseload("*"),
         )
-        .join(User, User.id == PartyMember.user_id)
-        .outerjoin(UserProfile, UserProfile.user_id == User.id)  # <- left join profile
-        .filter(PartyMember.party_id.in_(party_ids))
+        .order_by(Party.name.asc())
         .all()
     )
 
-    # Build party_id -> members list
-    members_map: dict[int, List[dict]] = {}
-    for pid, uid, uname, mcu in rows:
-        members_map.setdefault(pid, []).append(
-            {"user_id": uid, "username": uname, "minecraft_username": mcu}
-        )
-
-    # Compose response
-    out: List[PartyMeOut] = []
+    # Compose response as plain dicts and serialize with orjson directly --
+    # skips jsonable_encoder and the per-member Pydantic model construction.
+    out: list[dict] = []
     for p in parties:
         members = []
         leader_username = None
         leader_mc = None
 
-        for m in members_map.get(p.id, []):
-            is_leader = p.leader_user_id is not None and m["user_id"] == p.leader_user_id
+        for m in p.members:
+            u = m.user
+            mc_username = u.profile.minecraft_username if u.profile else None
+            is_leader = p.leader_user_id is not None and m.user_id == p.leader_user_id
             if is_leader:
-                leader_username = m["username"]
-                leader_mc = m["minecraft_username"]
-            members.append(
-                PartyMemberView(
-                    user_id=m["user_id"],
-                    username=m["username"],
-                    minecraft_username=m["minecraft_username"],
-                    is_leader=is_leader,
-                )
-            )
-
-        out.append(
-            PartyMeOut(
-                id=p.id,
-                name=p.name,
-                description=p.description,
-                leader_user_id=p.leader_user_id,
-                leader_username=leader_username,
-                leader_minecraft_username=leader_mc,
-                members=members,
-            )
-        )
-
-    return out
-
-@router.get("", response_model=List[PartyListOut])
+                leader_username = u.username
+                leader_mc = mc_username
+            members.append({
+                "user_id": m.user_id,
+                "username": u.username,
+                "minecraft_username": mc_username,
+                "is_leader": is_leader,
+            })
+
+        out.append({
+            "id": p.id,
+            "name": p.name,
+            "description": p.description,
+            "leader_user_id": p.leader_user_id,
+            "leader_username": leader_username,
+            "leader_minecraft_username": leader_mc,
+            "members": members,
+        })
+
+    return ORJSONResponse(out)
+
+@router.get("", response_class=ORJSONResponse)
 def list_parties(db: Session = Depends(get_db), user: User = Depends(manage_parties)):
+    # Correlated count per party instead of joining + grouping the whole
+    # membership table; each count is an index lookup on the party_members PK.
+    members_count = (
+        select(func.count(PartyMember.user_id))
+        .where(PartyMember.party_id == Party.id)
+        .correlate(Party)
+        .scalar_subquery()
+    )
     rows = (
-        db.query(Party.id, Party.name, func.count(PartyMember.user_id).label("members_count"))
-        .outerjoin(PartyMember, PartyMember.party_id == Party.id)
+        db.query(Party.id, Party.name, members_count.label("members_count"))
         .filter(Party.structure_id == user.structure_id)
-        .group_by(Party.id)
         .order_by(Party.name.asc())
         .all()
     )
-    return [{"id": r.id, "name": r.name, "members_count": r.members_count} for r in rows]
+    return ORJSONResponse([{"id": r.id, "name": r.name, "members_count": r.members_count} for r in rows])
 
 @router.post("", response_model=PartyOut, status_code=201)
 def create_party(payload: PartyIn, db: Session = Depends(get_db), user: User = Depends(manage_parties)):
-    dup = db.query(Party).filter(
-        Party.structure_id == user.structure_id, func.lower(Party.name) == func.lower(payload.name)
-    ).first()
-    if dup:
-        raise HTTPException(status_code=409, detail="Party with this name already exists")
     row = Party(
         structure_id=user.structure_id,
         name=payload.name,
@@ -127,30 +111,58 @@ def create_party(payload: PartyIn, db: Session = Depends(get_db), user: User = D
         created_by_user_id=user.id,
     )
     db.add(row)
-    db.commit()
+    # Name uniqueness (case-insensitive) is enforced by
+    # party_structure_lower_name_uidx; let the DB reject duplicates instead
+    # of pre-checking with a lower(name) scan.
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Party with this name already exists")
     db.refresh(row)
     return row
 
-@router.get("/{party_id}", response_model=PartyOut)
+@router.get("/{party_id}", response_model=PartyDetailOut)
 def get_party(party_id: int, db: Session = Depends(get_db), user: User = Depends(manage_parties)):
-    row = db.query(Party).filter(Party.id == party_id, Party.structure_id == user.structure_id).first()
+    # One query yields the party, its member count and the leader's username;
+    # previously callers needed follow-up requests for the latter two.
+    members_count = (
+        select(func.count(PartyMember.user_id))
+        .where(PartyMember.party_id == Party.id)
+        .correlate(Party)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(Party, members_count.label("members_count"), User.username.label("leader_username"))
+        .outerjoin(User, User.id == Party.leader_user_id)
+        .where(Party.id == party_id, Party.structure_id == user.structure_id)
+    ).first()
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
-    return row
+    party = row.Party
+    return PartyDetailOut(
+        id=party.id,
+        structure_id=party.structure_id,
+        name=party.name,
+        description=party.description,
+        created_by_user_id=party.created_by_user_id,
+        leader_user_id=party.leader_user_id,
+        leader_username=row.leader_username,
+        members_count=row.members_count,
+    )
 
 @router.put("/{party_id}", response_model=PartyOut)
 def update_party(party_id: int, payload: PartyIn, db: Session = Depends(get_db), user: User = Depends(manage_parties)):
     row = db.query(Party).filter(Party.id == party_id, Party.structure_id == user.structure_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
-    exists = db.query(Party).filter(
-        Party.structure_id == user.structure_id, func.lower(Party.name) == func.lower(payload.name), Party.id != party_id
-    ).first()
-    if exists:
-        raise HTTPException(status_code=409, detail="Another party with this name exists")
     row.name = payload.name
     row.description = payload.description
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Another party with this name exists")
     db.refresh(row)
     return row
 
@@ -165,8 +177,9 @@ def delete_party(party_id: int, db: Session = Depends(get_db), user: User = Depe
 
 @router.get("/{party_id}/members", response_model=List[int])
 def get_party_members(party_id: int, db: Session = Depends(get_db), user: User = Depends(manage_parties)):
-    exists = db.query(Party.id).filter(Party.id == party_id, Party.structure_id == user.structure_id).first()
-    if not exists:
+    if not db.query(
+        exists().where(Party.id == party_id, Party.structure_id == user.structure_id)
+    ).scalar():
         raise HTTPException(status_code=404, detail="Not found")
     rows = db.query(PartyMember.user_id).filter(PartyMember.party_id == party_id).order_by(PartyMember.user_id.asc()).all()
     return [r.user_id for r in rows]
@@ -184,17 +197,17 @@ def set_party_members(party_id: int, payload: PartyMembersIn, db: Session = Depe
         if cnt != len(ids):
             raise HTTPException(status_code=400, detail="Some users do not belong to this structure")
 
-    # Replace membership
+    # Replace membership with one multi-row INSERT instead of per-uid adds
     db.query(PartyMember).filter(PartyMember.party_id == party_id).delete(synchronize_session=False)
-    for uid in ids:
-        db.add(PartyMember(party_id=party_id, user_id=uid))
+    if ids:
+        db.bulk_insert_mappings(PartyMember, [{"party_id": party_id, "user_id": uid} for uid in ids])
 
     if party.leader_user_id is not None and party.leader_user_id not in ids:
         party.leader_user_id = None
 
     db.commit()
-    rows = db.query(PartyMember.user_id).filter(PartyMember.party_id == party_id).order_by(PartyMember.user_id.asc()).all()
-    return [r.user_id for r in rows]
+    # The validated input is authoritative; no need to re-SELECT what we wrote
+    return sorted(ids)
 
 @router.put("/{party_id}/leader", response_model=PartyOut)
 def set_party_leader(party_id: int, payload: PartyLeaderIn, db: Session = Depends(get_db), user: User = Depends(manage_parties)):
@@ -209,15 +222,18 @@ def set_party_leader(party_id: int, payload: PartyLeaderIn, db: Session = Depend
         db.refresh(party)
         return party
 
-    # Validate leader is a user of same structure
+    # Validate the leader belongs to this structure; there is no need to
+    # pre-check membership separately since the insert below is idempotent.
     has_user = db.query(User.id).filter(User.id == leader_id, User.structure_id == user.structure_id).first()
     if not has_user:
         raise HTTPException(status_code=400, detail="Leader user not in this structure")
 
-    # Ensure leader is a member (auto-add if missing)
-    is_member = db.query(PartyMember).filter(PartyMember.party_id == party_id, PartyMember.user_id == leader_id).first()
-    if not is_member:
-        db.add(PartyMember(party_id=party_id, user_id=leader_id))
+    # Ensure leader is a member (no-op if already one)
+    db.execute(
+        pg_insert(PartyMember)
+        .values(party_id=party_id, user_id=leader_id)
+        .on_conflict_do_nothing(index_elements=["party_id", "user_id"])
+    )
     party.leader_user_id = leader_id
 
     db.commit()
@@ -253,16 +269,16 @@ def send_message_to_party(
     # target the party
     db.add(MessageTarget(message_id=msg.id, party_id=party_id))
 
-    # expand recipients (all members now)
+    # expand recipients (all members now) with one bulk INSERT instead of a
+    # SELECT + INSERT per member
     member_rows = db.query(PartyMember.user_id).filter(PartyMember.party_id == party_id).all()
     member_ids = [r.user_id for r in member_rows]
-    for uid in member_ids:
-        exists = db.query(MessageRecipientStatus).filter(
-            MessageRecipientStatus.message_id == msg.id,
-            MessageRecipientStatus.user_id == uid,
-        ).first()
-        if not exists:
-            db.add(MessageRecipientStatus(message_id=msg.id, user_id=uid, status="QUEUED"))
+    if member_ids:
+        db.execute(
+            pg_insert(MessageRecipientStatus)
+            .values([{"message_id": msg.id, "user_id": uid, "status": "QUEUED"} for uid in member_ids])
+            .on_conflict_do_nothing(index_elements=["message_id", "user_id"])
+        )
 
     db.commit()
     return {"message_id": msg.id, "recipients": len(member_ids)}
\ No newline at end of file
@@ -1,11 +1,13 @@
+import base64
+import binascii
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import exists, tuple_
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import SessionLocal
-from app.services.deps import get_current_user, require_perm
+from app.services.deps import get_db, get_current_user, require_perm
 from app.models.user import User
 from app.models.item import Item
 from app.models.item_value import ItemValue
@@ -13,12 +15,9 @@ from app.models.inventory import PlayerInventory, PlayerInventoryLedger
 
 router = APIRouter(prefix="/inventory/player", tags=["inventory"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Built once at import; calling require_perm() per request allocated a fresh
+# closure every time someone viewed another player's inventory.
+_inventory_admin_check = require_perm("inventory.admin")
 
 # ---------- Snapshot ----------
 
@@ -31,10 +30,12 @@ def get_player_inventory(
 ):
     # Auth: self can view; otherwise need inventory.admin
     if current.id != user_id:
-        require_perm("inventory.admin")(current)
+        _inventory_admin_check(current)
 
-    # Scope: same structure
-    if not db.query(User.id).filter(User.id == user_id, User.structure_id == current.structure_id).first():
+    # Scope: same structure (EXISTS stops at the first matching row)
+    if not db.query(
+        exists().where(User.id == user_id, User.structure_id == current.structure_id)
+    ).scalar():
         raise HTTPException(status_code=404, detail="User not found")
 
     rows = (
@@ -45,21 +46,23 @@ def get_player_inventory(
         .all()
     )
 
-    # Optional valuation (use latest <= as_of; else latest overall)
+    # Optional valuation: latest value <= as_of per item via DISTINCT ON,
+    # which walks ix_item_values_lookup backwards instead of the old
+    # MAX(effective_from) subquery + self-join.
     values_map = {}
-    if as_of:
-        subq = (
-            db.query(
-                ItemValue.item_id,
-                func.max(ItemValue.effective_from).label("eff")
-            )
-            .filter(ItemValue.structure_id == current.structure_id, ItemValue.effective_from <= as_of)
-            .group_by(ItemValue.item_id)
-        ).subquery()
-
+    if as_of and rows:
+        # Only value items the player actually holds instead of pricing the
+        # whole catalogue.
+        held_ids = [item_id for item_id, _, _ in rows]
         pairs = (
             db.query(ItemValue.item_id, ItemValue.value_in_currency)
-            .join(subq, (subq.c.item_id == ItemValue.item_id) & (subq.c.eff == ItemValue.effective_from))
+            .filter(
+                ItemValue.structure_id == current.structure_id,
+                ItemValue.item_id.in_(held_ids),
+                ItemValue.effective_from <= as_of,
+            )
+            .distinct(ItemValue.item_id)
+            .order_by(ItemValue.item_id.asc(), ItemValue.effective_from.desc())
             .all()
         )
         values_map = {pid: val for pid, val in pairs}
@@ -88,18 +91,34 @@ def get_player_inventory(
 
 # ---------- Ledger ----------
 
+def _encode_ledger_cursor(ts: datetime, row_id: int) -> str:
+    raw = f"{ts.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_ledger_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts_raw, id_raw = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(ts_raw), int(id_raw)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/{user_id}/ledger")
 def get_player_ledger(
     user_id: int,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    with_total: bool = Query(False, description="Include total row count (extra query)"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
     if current.id != user_id:
-        require_perm("inventory.admin")(current)
+        _inventory_admin_check(current)
 
-    if not db.query(User.id).filter(User.id == user_id, User.structure_id == current.structure_id).first():
+    if not db.query(
+        exists().where(User.id == user_id, User.structure_id == current.structure_id)
+    ).scalar():
         raise HTTPException(status_code=404, detail="User not found")
 
     q = (
@@ -117,13 +136,24 @@ def get_player_ledger(
         .filter(PlayerInventoryLedger.user_id == user_id, PlayerInventoryLedger.structure_id == current.structure_id)
         .order_by(PlayerInventoryLedger.timestamp.desc(), PlayerInventoryLedger.id.desc())
     )
-    total = q.count()
-    rows = q.limit(limit).offset(offset).all()
+    # Keyset pagination: seek past the last (timestamp, id) seen instead of
+    # OFFSET, which re-reads every skipped row on deep pages.
+    if cursor:
+        after_ts, after_id = _decode_ledger_cursor(cursor)
+        q = q.filter(
+            tuple_(PlayerInventoryLedger.timestamp, PlayerInventoryLedger.id) < tuple_(after_ts, after_id)
+        )
+
+    # COUNT(*) over the whole ledger is expensive; only run it when asked.
+    total = q.count() if with_total else None
+    rows = q.limit(limit).all()
+
+    next_cursor = _encode_ledger_cursor(rows[-1].timestamp, rows[-1].id) if len(rows) == limit else None
 
     return {
         "total": total,
         "limit": limit,
-        "offset": offset,
+        "next_cursor": next_cursor,
         "rows": [
             {
                 "id": r.id,
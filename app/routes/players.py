@@ -1,16 +1,21 @@
 # app/routes/players.py
-from fastapi import APIRouter, Depends, HTTPException, Request
+import base64
+import binascii
+from typing import Dict, Optional, Tuple
+from time import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import case, delete, event, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime, timezone
 
 from app.services.deps import get_db, get_current_user, has_perm
-from app.models.user import User
+from app.models.user import User, user_roles
 from app.models.role import Role
 from app.models.structure import Structure
 from app.schemas.players import (
-    UnassignedPlayersResponse,
-    PlayerOut,
     AssignPlayerRequest,
     AssignPlayerResponse,
     GuestsResponse,
@@ -24,44 +29,63 @@ from app.services.audit import log_auth_event
 router = APIRouter(prefix="/api", tags=["players"])
 
 
+_LOWEST_ROLE_TTL_SECONDS = 60
+
+# simple TTL cache: key=structure_id -> (role_id, expires_at)
+_lowest_role_cache: Dict[str, Tuple[int, float]] = {}
+
+
 def get_lowest_member_role(db: Session, structure_id: str) -> Role:
     """Get the lowest non-guest role for a structure (typically MEMBER)."""
-    # Try to find MEMBER role first
-    member_role = db.query(Role).filter(
-        Role.structure_id == structure_id,
-        Role.role_type == "MEMBER"
-    ).first()
-
-    if member_role:
-        return member_role
+    cached = _lowest_role_cache.get(structure_id)
+    if cached and cached[1] > time():
+        role = db.get(Role, cached[0])
+        if role is not None and role.structure_id == structure_id:
+            return role
+        _lowest_role_cache.pop(structure_id, None)
+
+    # One query ranking MEMBER first, then any non-admin role, then anything --
+    # replaces the previous three fallback SELECTs.
+    role = (
+        db.query(Role)
+        .filter(Role.structure_id == structure_id)
+        .order_by(
+            case(
+                (Role.role_type == "MEMBER", 0),
+                (Role.role_type.notin_(["OWNER", "ADMIN"]), 1),
+                else_=2,
+            ),
+            Role.id.asc(),
+        )
+        .first()
+    )
+    if not role:
+        raise HTTPException(status_code=500, detail="No roles found for structure")
 
-    # If no MEMBER role, find any non-OWNER, non-ADMIN role
-    fallback_role = db.query(Role).filter(
-        Role.structure_id == structure_id,
-        Role.role_type.notin_(["OWNER", "ADMIN"])
-    ).first()
+    _lowest_role_cache[structure_id] = (role.id, time() + _LOWEST_ROLE_TTL_SECONDS)
+    return role
 
-    if fallback_role:
-        return fallback_role
 
-    # Last resort: find any role
-    any_role = db.query(Role).filter(
-        Role.structure_id == structure_id
-    ).first()
+def _invalidate_lowest_role(mapper, connection, target: Role) -> None:
+    _lowest_role_cache.pop(target.structure_id, None)
 
-    if not any_role:
-        raise HTTPException(status_code=500, detail="No roles found for structure")
 
-    return any_role
+# Role churn can change which role ranks lowest; drop the cached entry so the
+# next assignment recomputes it.
+event.listen(Role, "after_insert", _invalidate_lowest_role)
+event.listen(Role, "after_update", _invalidate_lowest_role)
+event.listen(Role, "after_delete", _invalidate_lowest_role)
 
 
-@router.get("/admin/unassigned-players", response_model=UnassignedPlayersResponse)
+@router.get("/admin/unassigned-players", response_class=ORJSONResponse)
 def get_unassigned_players(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all players who have no structure assigned.
+    Get players who have no structure assigned, newest first, paginated.
     Requires: users.view_unassigned permission (configurable per structure).
 
     For now, accessible to all admins of any structure.
@@ -70,39 +94,54 @@ def get_unassigned_players(
     if not current_user.structure_id:
         raise HTTPException(status_code=403, detail="You must be in a structure to access this")
 
-    # Check if user has admin permissions
-    is_admin = any(role.role_type in ["OWNER", "ADMIN"] for role in current_user.roles)
-
     # TODO: Make this configurable - check for users.view_unassigned permission
-    if not is_admin:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=403,
             detail="You need admin permissions to view unassigned players"
         )
 
-    # Query unassigned players
-    unassigned = db.query(User).filter(
+    # Query unassigned players page by page: keyset on (created_at, id)
+    # instead of loading every unassigned user at once
+    q = db.query(User).filter(
         or_(
             User.structure_id.is_(None),
             User.membership_status == "unassigned"
         )
-    ).order_by(User.created_at.desc()).all()
-
-    return UnassignedPlayersResponse(
-        players=[
-            PlayerOut(
-                userId=u.id,
-                mcUuid=u.mc_uuid,
-                username=u.username,
-                hasPassword=u.has_password,
-                structureId=u.structure_id,
-                membershipStatus=u.membership_status,
-                createdAt=u.created_at,
-                lastLogin=u.last_login
-            ) for u in unassigned
+    ).order_by(User.created_at.desc(), User.id.desc())
+    if cursor:
+        try:
+            ts_raw, id_raw = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            after = (datetime.fromisoformat(ts_raw), int(id_raw))
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.filter(tuple_(User.created_at, User.id) < tuple_(*after))
+    unassigned = q.limit(limit).all()
+
+    next_cursor = None
+    if len(unassigned) == limit:
+        last = unassigned[-1]
+        next_cursor = base64.urlsafe_b64encode(
+            f"{last.created_at.isoformat()}|{last.id}".encode()
+        ).decode()
+
+    # Plain dicts + orjson: skips per-row Pydantic model construction
+    return ORJSONResponse({
+        "players": [
+            {
+                "userId": u.id,
+                "mcUuid": u.mc_uuid,
+                "username": u.username,
+                "hasPassword": u.has_password,
+                "structureId": u.structure_id,
+                "membershipStatus": u.membership_status,
+                "createdAt": u.created_at,
+                "lastLogin": u.last_login,
+            } for u in unassigned
         ],
-        count=len(unassigned)
-    )
+        "count": len(unassigned),
+        "next_cursor": next_cursor,
+    })
 
 
 @router.post("/admin/assign-player/{user_id}", response_model=AssignPlayerResponse)
@@ -122,16 +161,24 @@ def assign_player_to_structure(
     if not current_user.structure_id:
         raise HTTPException(status_code=403, detail="You must be in a structure")
 
-    is_admin = any(role.role_type in ["OWNER", "ADMIN"] for role in current_user.roles)
-
     # TODO: Make configurable with users.assign permission
-    if not is_admin:
+    if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="You need admin permissions to assign players")
 
-    # Find the player to assign
-    player = db.query(User).filter(User.id == user_id).first()
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
+    # Fetch the player and the admin's structure in one round trip, locking
+    # the player row so two admins can't assign the same player concurrently.
+    pair = db.execute(
+        select(User, Structure)
+        .join(Structure, Structure.id == current_user.structure_id)
+        .where(User.id == user_id)
+        .with_for_update(of=User)
+    ).first()
+    if not pair:
+        # No row at all: either the player or the structure is missing
+        if not db.query(User.id).filter(User.id == user_id).first():
+            raise HTTPException(status_code=404, detail="Player not found")
+        raise HTTPException(status_code=500, detail="Your structure not found")
+    player, structure = pair
 
     # Verify player is unassigned
     if player.structure_id is not None:
@@ -140,11 +187,6 @@ def assign_player_to_structure(
             detail=f"Player is already in structure '{player.structure_id}'"
         )
 
-    # Get the structure
-    structure = db.query(Structure).filter(Structure.id == current_user.structure_id).first()
-    if not structure:
-        raise HTTPException(status_code=500, detail="Your structure not found")
-
     # Determine which role to assign
     if payload.roleId:
         # Verify role exists and belongs to this structure
@@ -162,9 +204,13 @@ def assign_player_to_structure(
     player.structure_id = current_user.structure_id
     player.membership_status = "member"
 
-    # Assign role
-    if role not in player.roles:
-        player.roles.append(role)
+    # Assign role without loading the roles collection; the insert is a no-op
+    # if the assignment already exists
+    db.execute(
+        pg_insert(user_roles)
+        .values(user_id=player.id, role_id=role.id)
+        .on_conflict_do_nothing(index_elements=["user_id", "role_id"])
+    )
 
     # Log the event
     log_auth_event(
@@ -207,11 +253,8 @@ def get_structure_guests(
     if current_user.structure_id != structure_id:
         raise HTTPException(status_code=403, detail="You are not in this structure")
 
-    # Check if user is admin
-    is_admin = any(role.role_type in ["OWNER", "ADMIN"] for role in current_user.roles)
-
     # TODO: Make configurable with members.approve_guests permission
-    if not is_admin:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=403,
             detail="You need admin permissions to view pending guests"
@@ -254,11 +297,8 @@ def approve_guest(
     if current_user.structure_id != structure_id:
         raise HTTPException(status_code=403, detail="You are not in this structure")
 
-    # Check if user is admin
-    is_admin = any(role.role_type in ["OWNER", "ADMIN"] for role in current_user.roles)
-
     # TODO: Make configurable with members.approve_guests permission
-    if not is_admin:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=403,
             detail="You need admin permissions to approve guests"
@@ -295,9 +335,12 @@ def approve_guest(
     # Approve guest
     guest.membership_status = "member"
 
-    # Assign role
-    if role not in guest.roles:
-        guest.roles.append(role)
+    # Assign role idempotently, skipping the membership scan
+    db.execute(
+        pg_insert(user_roles)
+        .values(user_id=guest.id, role_id=role.id)
+        .on_conflict_do_nothing(index_elements=["user_id", "role_id"])
+    )
 
     # Log the event
     log_auth_event(
@@ -340,11 +383,8 @@ def reject_guest(
     if current_user.structure_id != structure_id:
         raise HTTPException(status_code=403, detail="You are not in this structure")
 
-    # Check if user is admin
-    is_admin = any(role.role_type in ["OWNER", "ADMIN"] for role in current_user.roles)
-
     # TODO: Make configurable with members.approve_guests permission
-    if not is_admin:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=403,
             detail="You need admin permissions to reject guests"
@@ -369,8 +409,9 @@ def reject_guest(
     guest.structure_id = None
     guest.membership_status = "unassigned"
 
-    # Remove any roles they might have
-    guest.roles.clear()
+    # Remove any roles they might have with one DELETE instead of loading
+    # the collection and unlinking row by row
+    db.execute(delete(user_roles).where(user_roles.c.user_id == guest.id))
 
     # Log the event
     log_auth_event(
@@ -1,7 +1,11 @@
 # app/routes/rbac.py
+from typing import Dict, Tuple
+from time import time
+
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import event, select
 
 from app.services.deps import get_db, get_current_structure, require_perm
 from app.models.user import User
@@ -12,7 +16,38 @@ from app.models.location_guild_master import LocationGuildMaster
 router = APIRouter(prefix="/rbac", tags=["RBAC"])
 view_guard = require_perm("rbac.view")
 
-@router.get("/graph")
+_GRAPH_TTL_SECONDS = 60
+
+# TTL cache for the assembled graph payload:
+# key=(structure_id, include_roles, include_users, include_locations)
+# -> (payload, expires_at, version_at_build)
+_graph_cache: Dict[Tuple[str, bool, bool, bool], Tuple[dict, float, int]] = {}
+# Bumped on role/location churn so writes invalidate before the TTL lapses
+_graph_versions: Dict[str, int] = {}
+
+
+def _bump_graph_version(mapper, connection, target) -> None:
+    sid = target.structure_id
+    _graph_versions[sid] = _graph_versions.get(sid, 0) + 1
+
+
+def _clear_graph_cache(mapper, connection, target) -> None:
+    # LocationGuildMaster rows carry no structure_id; dropping everything is
+    # cheap and correct
+    _graph_cache.clear()
+
+
+event.listen(Role, "after_insert", _bump_graph_version)
+event.listen(Role, "after_update", _bump_graph_version)
+event.listen(Role, "after_delete", _bump_graph_version)
+event.listen(Location, "after_insert", _bump_graph_version)
+event.listen(Location, "after_update", _bump_graph_version)
+event.listen(Location, "after_delete", _bump_graph_version)
+event.listen(LocationGuildMaster, "after_insert", _clear_graph_cache)
+event.listen(LocationGuildMaster, "after_delete", _clear_graph_cache)
+
+# The graph can run to thousands of nested dicts; serialize it in C
+@router.get("/graph", response_class=ORJSONResponse)
 def get_rbac_graph(
     include_roles: bool = True,
     include_users: bool = True,
@@ -21,70 +56,75 @@ def get_rbac_graph(
     structure_id: str = Depends(get_current_structure),
     _: User = Depends(view_guard),
 ):
+    # RBAC changes are rare relative to graph views; serve a cached payload
+    # while it is fresh and the structure hasn't seen role/location churn
+    cache_key = (structure_id, include_roles, include_users, include_locations)
+    version = _graph_versions.get(structure_id, 0)
+    cached = _graph_cache.get(cache_key)
+    if cached and cached[1] > time() and cached[2] == version:
+        return cached[0]
+
+    # Assembled with straight-line loops and extend-over-generator instead of
+    # add_node/add_edge closures: each closure call cost a frame plus repeated
+    # kind dispatch for rows we already know are unique.
     nodes: list[dict] = []
     edges: list[dict] = []
 
-    # Keep track to avoid duplicates
-    seen_node_ids: set[str] = set()
-
-    def add_node(kind: str, raw_id: int, label: str):
-        nid = f"{'role' if kind=='role' else 'user' if kind=='user' else 'loc'}:{raw_id}"
-        if nid in seen_node_ids:
-            return
-        nodes.append({"data": {"id": nid, "label": label, "category": ("role" if kind=="role" else "user" if kind=="user" else "location")}})
-        seen_node_ids.add(nid)
-
-    def add_edge(source: str, target: str, etype: str):
-        edges.append({"data": {"source": source, "target": target, "type": etype}})
+    # Dedup only where duplicates are actually possible (nodes synthesized
+    # while walking edges); int sets hash cheaper than the old "kind:id"
+    # string keys
+    seen_role_ids: set[int] = set()
+    seen_user_ids: set[int] = set()
 
     # Roles
-    roles_by_id: dict[int, Role] = {}
     if include_roles:
         roles = db.execute(
             select(Role).where(Role.structure_id == structure_id).order_by(Role.name.asc())
         ).scalars().all()
-        for r in roles:
-            roles_by_id[r.id] = r
-            add_node("role", r.id, r.name)
+        nodes.extend({"data": {"id": f"role:{r.id}", "label": r.name, "category": "role"}} for r in roles)
+        seen_role_ids.update(r.id for r in roles)
 
     # Users (+ roles eager-loaded)
     users: list[User] = []
     if include_users:
         users = (
             db.query(User)
-              .options(joinedload(User.roles))
+              .options(selectinload(User.roles))
               .filter(User.structure_id == structure_id)
               .order_by(User.username.asc())
               .all()
         )
+        nodes.extend({"data": {"id": f"user:{u.id}", "label": u.username, "category": "user"}} for u in users)
         for u in users:
-            add_node("user", u.id, u.username)
+            uid = f"user:{u.id}"
             # role -> user edges (multi-role)
             for r in u.roles:
-                # if roles are not requested we still may need their nodes as edge sources
-                if include_roles:
-                    pass
-                else:
-                    add_node("role", r.id, r.name)
-                add_edge(f"role:{r.id}", f"user:{u.id}", "assigned")
+                # if roles were not requested we still need their nodes as edge sources
+                if not include_roles and r.id not in seen_role_ids:
+                    seen_role_ids.add(r.id)
+                    nodes.append({"data": {"id": f"role:{r.id}", "label": r.name, "category": "role"}})
+                edges.append({"data": {"source": f"role:{r.id}", "target": uid, "type": "assigned"}})
 
     # Locations + guildmaster assignments (user -> location)
     if include_locations:
         locs = db.query(Location).filter(Location.structure_id == structure_id).order_by(Location.name.asc()).all()
-        for loc in locs:
-            add_node("loc", loc.id, loc.name)
-
-        # link guild masters to their locations
-        gm_links = (
-            db.query(LocationGuildMaster)
-              .join(Location, Location.id == LocationGuildMaster.location_id)
-              .filter(Location.structure_id == structure_id)
-              .all()
-        )
-        for gm in gm_links:
+        nodes.extend({"data": {"id": f"loc:{loc.id}", "label": loc.name, "category": "location"}} for loc in locs)
+
+        # link guild masters to their locations; the locations are already in
+        # memory, so filter by their ids instead of re-joining Location just
+        # to apply the structure scope, and fetch bare id tuples
+        loc_ids = [loc.id for loc in locs]
+        gm_links = db.execute(
+            select(LocationGuildMaster.user_id, LocationGuildMaster.location_id)
+            .where(LocationGuildMaster.location_id.in_(loc_ids))
+        ).all() if loc_ids else []
+        for user_id, location_id in gm_links:
             # ensure user node exists even if users list was skipped
-            if include_users is False:
-                add_node("user", gm.user_id, f"user:{gm.user_id}")
-            add_edge(f"user:{gm.user_id}", f"loc:{gm.location_id}", "manages")
+            if not include_users and user_id not in seen_user_ids:
+                seen_user_ids.add(user_id)
+                nodes.append({"data": {"id": f"user:{user_id}", "label": f"user:{user_id}", "category": "user"}})
+            edges.append({"data": {"source": f"user:{user_id}", "target": f"loc:{location_id}", "type": "manages"}})
 
-    return {"nodes": nodes, "edges": edges}
+    payload = {"nodes": nodes, "edges": edges}
+    _graph_cache[cache_key] = (payload, time() + _GRAPH_TTL_SECONDS, version)
+    return payload
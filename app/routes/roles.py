@@ -1,7 +1,6 @@
 # app/routes/roles.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 import sqlalchemy as sa
 
@@ -21,12 +20,13 @@ def list_roles(
     structure_id: str = Depends(get_current_structure),
     _: User = Depends(admin_guard),
 ):
-    rows = (
-        db.query(Role)
-        .filter(Role.structure_id == structure_id)
+    # Columnar projection: the listing never mutates roles, so skip full ORM
+    # instance construction and fetch only what RoleOut serializes
+    rows = db.execute(
+        sa.select(Role.id, Role.structure_id, Role.name, Role.role_type, Role.permissions, Role.is_custom)
+        .where(Role.structure_id == structure_id)
         .order_by(Role.name.asc())
-        .all()
-    )
+    ).all()
     return rows
 
 @router.post("", response_model=RoleOut, status_code=status.HTTP_201_CREATED)
@@ -36,29 +36,21 @@ def create_role(
     structure_id: str = Depends(get_current_structure),
     _: User = Depends(admin_guard),
 ):
-    # Enforce per-structure uniqueness on name & code (case-insensitive)
-    name_ci = func.lower(payload.name)
-    code_ci = func.lower(payload.code)
-    conflict = (
-        db.query(Role)
-        .filter(
-            Role.structure_id == structure_id,
-            (func.lower(Role.name) == name_ci) | (func.lower(Role.code) == code_ci),
-        )
-        .first()
-    )
-    if conflict:
-        raise HTTPException(status_code=409, detail="Role with same name or code already exists")
-
     row = Role(
         structure_id=structure_id,
+        role_type="CUSTOM",
         name=payload.name,
-        code=payload.code,
         permissions=payload.permissions or {},
-        is_system=False,
+        is_custom=True,
     )
     db.add(row)
-    db.commit()
+    # Per-structure name uniqueness (case-insensitive) is enforced by
+    # ux_roles_struct_lname; one INSERT replaces the old SELECT + INSERT pair
+    try:
+        db.commit()
+    except sa.exc.IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Role with same name already exists")
     db.refresh(row)
     return row
 
@@ -85,28 +77,24 @@ def update_role(
     row = db.query(Role).filter_by(id=role_id, structure_id=structure_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Role not found")
-    if row.is_system:
-        # System roles may be editable if you wish; for now we lock name/code
-        if payload.name or payload.code:
-            raise HTTPException(400, detail="Cannot rename or recode a system role")
-
-    if payload.name or payload.code:
-        q = db.query(Role).filter(Role.structure_id == structure_id, Role.id != role_id)
+    if not row.is_custom:
+        # System roles may be editable if you wish; for now we lock the name
         if payload.name:
-            q = q.filter(func.lower(Role.name) == func.lower(payload.name))
-        if payload.code:
-            q = q.filter(func.lower(Role.code) == func.lower(payload.code))
-        if q.first():
-            raise HTTPException(409, "Duplicate role name/code in this structure")
+            raise HTTPException(400, detail="Cannot rename a system role")
 
     if payload.name is not None:
         row.name = payload.name
-    if payload.code is not None:
-        row.code = payload.code
     if payload.permissions is not None:
         row.permissions = payload.permissions
 
-    db.commit(); db.refresh(row)
+    # ux_roles_struct_lname flags renames that collide case-insensitively;
+    # no pre-check SELECT needed
+    try:
+        db.commit()
+    except sa.exc.IntegrityError:
+        db.rollback()
+        raise HTTPException(409, "Duplicate role name in this structure")
+    db.refresh(row)
     return row
 
 @router.delete("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -116,21 +104,26 @@ def delete_role(
     structure_id: str = Depends(get_current_structure),
     _: object = Depends(admin_guard),
 ):
-    # fetch role within current structure
+    # Hot path: one conditional DELETE that refuses system roles and roles
+    # still assigned to users, instead of SELECT + SELECT + DELETE
+    deleted = db.execute(
+        sa.text(
+            "DELETE FROM roles "
+            "WHERE id = :rid AND structure_id = :sid AND is_custom = true "
+            "AND NOT EXISTS (SELECT 1 FROM user_roles WHERE role_id = :rid) "
+            "RETURNING id"
+        ),
+        {"rid": role_id, "sid": structure_id},
+    ).first()
+    if deleted:
+        db.commit()
+        return
+
+    # Rare path: nothing deleted -- classify for the right error
+    db.rollback()
     row = db.query(Role).filter_by(id=role_id, structure_id=structure_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Role not found")
-    if row.is_system:
+    if not row.is_custom:
         raise HTTPException(status_code=400, detail="Cannot delete a system role")
-
-    # guard: role assigned to any user via user_roles?
-    assigned = db.execute(
-        sa.text("SELECT 1 FROM user_roles WHERE role_id = :rid LIMIT 1"),
-        {"rid": row.id},
-    ).first()
-    if assigned:
-        raise HTTPException(status_code=400, detail="Cannot delete a role that is assigned to users")
-
-    db.delete(row)
-    db.commit()
-    return
\ No newline at end of file
+    raise HTTPException(status_code=400, detail="Cannot delete a role that is assigned to users")
\ No newline at end of file
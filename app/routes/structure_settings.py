@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, load_only
 
 from app.services.deps import get_db, get_current_user, has_perm
 from app.models.user import User
@@ -16,8 +16,14 @@ def ensure_admin(u: User):
 
 @router.get("", response_model=StructureSettingsOut)
 def get_settings(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    # PK is structure_id
-    ss = db.get(StructureSettings, user.structure_id)
+    # PK is structure_id; the relationship is lazy="joined" so this is one
+    # query, but this endpoint is polled and only reads the item name, so
+    # trim the joined row to id+name
+    ss = db.get(
+        StructureSettings,
+        user.structure_id,
+        options=[joinedload(StructureSettings.currency_item).options(load_only(Item.name))],
+    )
     if not ss:
         ss = StructureSettings(structure_id=user.structure_id)
         db.add(ss); db.commit(); db.refresh(ss)
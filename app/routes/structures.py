@@ -1,10 +1,12 @@
 # app/routes/structures.py
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
 from datetime import datetime, timezone
 
-from app.services.deps import get_db, get_current_user
-from app.models.user import User
+from app.services.deps import get_db, get_current_user, ROLE_HIERARCHY
+from app.models.user import User, user_roles
 from app.models.structure import Structure
 from app.models.structure_join_code import StructureJoinCode
 from app.schemas.structures import (
@@ -34,15 +36,15 @@ def has_structure_permission(user: User, structure_id: str, required_role: str =
     if user.structure_id != structure_id:
         return False
 
-    if not user.roles:
-        return False
-
-    # Check if user has required role or higher
-    role_hierarchy = {"OWNER": 3, "ADMIN": 2, "MEMBER": 1}
-    user_max_role = max([role_hierarchy.get(r.role_type, 0) for r in user.roles], default=0)
-    required_level = role_hierarchy.get(required_role, 0)
+    # get_current_user precomputes the max role level; fall back to scanning
+    # roles for users loaded outside the dependency
+    user_max_role = getattr(user, "_max_role_level", None)
+    if user_max_role is None:
+        user_max_role = max(
+            (ROLE_HIERARCHY.get(r.role_type, 0) for r in user.roles), default=0
+        )
 
-    return user_max_role >= required_level
+    return user_max_role >= ROLE_HIERARCHY.get(required_role, 0)
 
 
 @router.post("/{structure_id}/codes", response_model=JoinCodeOut)
@@ -68,27 +70,30 @@ def create_join_code(
             detail="You must be an admin or owner of this structure to create join codes"
         )
 
-    # Generate unique code
-    code_str = generate_join_code(structure_id)
-
-    # Ensure code is unique (very unlikely collision, but check anyway)
-    existing = db.query(StructureJoinCode).filter(StructureJoinCode.code == code_str).first()
-    if existing:
-        # Regenerate if collision
-        code_str = generate_join_code(structure_id) + str(datetime.now().microsecond)[:4]
-
-    # Create join code
-    join_code = StructureJoinCode(
-        code=code_str,
-        structure_id=structure_id,
-        created_by_user_id=current_user.id,
-        expires_at=payload.expiresAt,
-        max_uses=payload.maxUses,
-        used_count=0,
-        is_active=True
-    )
+    # The DB's unique constraint on code is the authority on collisions, so
+    # insert optimistically instead of pre-checking with a SELECT; on the
+    # (very unlikely) conflict, roll back to the savepoint and regenerate
+    join_code = None
+    for _ in range(3):
+        candidate = StructureJoinCode(
+            code=generate_join_code(structure_id),
+            structure_id=structure_id,
+            created_by_user_id=current_user.id,
+            expires_at=payload.expiresAt,
+            max_uses=payload.maxUses,
+            used_count=0,
+            is_active=True
+        )
+        try:
+            with db.begin_nested():
+                db.add(candidate)
+        except IntegrityError:
+            continue
+        join_code = candidate
+        break
 
-    db.add(join_code)
+    if join_code is None:
+        raise HTTPException(status_code=500, detail="Failed to generate a unique join code")
 
     # Log the event
     log_auth_event(
@@ -97,13 +102,14 @@ def create_join_code(
         user_id=current_user.id,
         mc_uuid=current_user.mc_uuid,
         request=request,
-        metadata={"structure_id": structure_id, "code": code_str}
+        metadata={"structure_id": structure_id, "code": join_code.code}
     )
 
     db.commit()
     db.refresh(join_code)
 
-    return JoinCodeOut(
+    # Responses below are built from rows we just wrote; skip re-validation
+    return JoinCodeOut.model_construct(
         id=join_code.id,
         code=join_code.code,
         structureId=join_code.structure_id,
@@ -137,11 +143,17 @@ def list_join_codes(
         StructureJoinCode.structure_id == structure_id
     ).order_by(StructureJoinCode.created_at.desc()).all()
 
+    # Resolve all creator usernames with one IN query instead of one SELECT
+    # per code
+    creator_ids = {code.created_by_user_id for code in codes}
+    names = dict(
+        db.query(User.id, User.username).filter(User.id.in_(creator_ids)).all()
+    ) if creator_ids else {}
+
     # Build response
     code_outs = []
     for code in codes:
-        created_by = db.query(User).filter(User.id == code.created_by_user_id).first()
-        code_outs.append(JoinCodeOut(
+        code_outs.append(JoinCodeOut.model_construct(
             id=code.id,
             code=code.code,
             structureId=code.structure_id,
@@ -149,7 +161,7 @@ def list_join_codes(
             maxUses=code.max_uses,
             usedCount=code.used_count,
             isActive=code.is_active,
-            createdBy=created_by.username if created_by else "Unknown",
+            createdBy=names.get(code.created_by_user_id, "Unknown"),
             createdAt=code.created_at
         ))
 
@@ -212,40 +224,45 @@ def join_via_code(
     """
     Join a structure using a code (from website, requires JWT).
     """
-    # Find and validate join code
-    code = db.query(StructureJoinCode).filter(
-        StructureJoinCode.code == payload.code,
-        StructureJoinCode.is_active == True
-    ).first()
-
-    if not code:
-        raise HTTPException(status_code=400, detail="Invalid or inactive join code")
-
-    # Check expiration
-    if code.expires_at and code.expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=400, detail="Join code has expired")
-
-    # Check max uses
-    if code.max_uses and code.used_count >= code.max_uses:
-        raise HTTPException(status_code=400, detail="Join code has reached maximum uses")
-
-    # Check if user is already in a structure
+    # Check membership first so a rejected join never consumes a code use
     if current_user.structure_id:
         raise HTTPException(
             status_code=409,
             detail=f"You are already in structure '{current_user.structure_id}'. Please leave first."
         )
 
+    # Validate and claim the code in one atomic UPDATE ... RETURNING: the
+    # WHERE re-checks activity/expiry/max-uses at increment time, closing the
+    # window where two concurrent joins both pass a separate SELECT
+    now = datetime.now(timezone.utc)
+    claimed = db.execute(
+        update(StructureJoinCode)
+        .where(
+            StructureJoinCode.code == payload.code,
+            StructureJoinCode.is_active == True,
+            or_(StructureJoinCode.expires_at.is_(None), StructureJoinCode.expires_at > now),
+            or_(StructureJoinCode.max_uses.is_(None), StructureJoinCode.used_count < StructureJoinCode.max_uses),
+        )
+        .values(used_count=StructureJoinCode.used_count + 1)
+        .returning(StructureJoinCode.id, StructureJoinCode.structure_id)
+    ).first()
+
+    if not claimed:
+        # Rare path: classify the rejection for the right error message
+        code = db.query(StructureJoinCode).filter(StructureJoinCode.code == payload.code).first()
+        if not code or not code.is_active:
+            raise HTTPException(status_code=400, detail="Invalid or inactive join code")
+        if code.expires_at and code.expires_at < now:
+            raise HTTPException(status_code=400, detail="Join code has expired")
+        raise HTTPException(status_code=400, detail="Join code has reached maximum uses")
+
     # Get structure info
-    structure = db.query(Structure).filter(Structure.id == code.structure_id).first()
+    structure = db.query(Structure).filter(Structure.id == claimed.structure_id).first()
     if not structure:
         raise HTTPException(status_code=500, detail="Structure not found")
 
     # Update user's structure
-    current_user.structure_id = code.structure_id
-
-    # Increment code usage
-    code.used_count += 1
+    current_user.structure_id = claimed.structure_id
 
     # Log the event
     log_auth_event(
@@ -254,7 +271,7 @@ def join_via_code(
         user_id=current_user.id,
         mc_uuid=current_user.mc_uuid,
         request=request,
-        metadata={"structure_id": code.structure_id, "code_id": code.id}
+        metadata={"structure_id": claimed.structure_id, "code_id": claimed.id}
     )
 
     db.commit()
@@ -284,8 +301,9 @@ def leave_structure(
     current_user.structure_id = None
     current_user.membership_status = "unassigned"
 
-    # Clear all roles
-    current_user.roles.clear()
+    # Clear all roles with one DELETE on the association table instead of
+    # loading the collection and unlinking row by row
+    db.execute(delete(user_roles).where(user_roles.c.user_id == current_user.id))
 
     # Log the event
     log_auth_event(
@@ -365,28 +383,35 @@ def get_public_structures(
     Get all active structures (nations/factions) that can be joined.
     Shows member count and whether the current user can join.
     """
-    # Get all active structures
-    structures = db.query(Structure).filter(Structure.is_active == True).all()
+    # Get all active structures, only the columns the listing renders
+    structures = (
+        db.query(Structure)
+        .options(load_only(Structure.id, Structure.display_name, Structure.description))
+        .filter(Structure.is_active == True)
+        .all()
+    )
+
+    # One aggregate instead of a COUNT(*) round trip per structure
+    counts = dict(
+        db.query(User.structure_id, func.count(User.id))
+        .filter(User.membership_status == "member")
+        .group_by(User.structure_id)
+        .all()
+    )
 
     result = []
     for structure in structures:
-        # Count members (exclude guests)
-        member_count = db.query(User).filter(
-            User.structure_id == structure.id,
-            User.membership_status == "member"
-        ).count()
-
         # User can join if they're not already in this structure or as a guest
         can_join = (
             current_user.structure_id != structure.id and
             current_user.membership_status != "guest"
         )
 
-        result.append(PublicStructureOut(
+        result.append(PublicStructureOut.model_construct(
             id=structure.id,
             displayName=structure.display_name,
             description=structure.description,
-            memberCount=member_count,
+            memberCount=counts.get(structure.id, 0),
             canJoin=can_join
         ))
 
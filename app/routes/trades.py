@@ -1,48 +1,96 @@
 # app/routes/trades.py
+import base64
+import binascii
+from datetime import datetime
 from decimal import Decimal
+from typing import Optional
 
-from sqlalchemy import exists, and_, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, exists, and_, insert, or_, text, tuple_
+from sqlalchemy.orm import Session, selectinload
 
-from fastapi import APIRouter, Depends, Response, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, status, HTTPException
+
+from pydantic import TypeAdapter
 
 from app.models import MovementReason, Location
 from app.models.trade import Trade
 from app.models.trade_line import TradeLine
 from app.models.user import User
-from app.schemas.trade import TradeOut, TradeLineOut, TradeCreate
+from app.schemas.trade import TradeOut, TradeLineOut, TradeCreate, TradePage
 from app.services.deps import get_db, get_current_user, get_current_structure, has_perm
 from app.services.trade_hooks import apply_user_ledgers_and_inventory
 from app.services.valuation import get_item_value_at
 
 router = APIRouter(prefix="/trades", tags=["Trades"])
 
+# Built once at import; serializing through it straight to bytes skips
+# FastAPI's per-request response-model revalidation of the whole page
+_TRADE_PAGE_ADAPTER = TypeAdapter(TradePage)
+
 
-def _compute_profit(db: Session, t: Trade) -> float | None:
+def _compute_profit(db: Session, t: Trade, lines: list[TradeLine]) -> float | None:
     structure_id = t.structure_id
     ts = t.timestamp
 
-    lines = db.query(TradeLine).filter_by(trade_id=t.id).all()
     if not lines:
         return 0.0
 
-    total = Decimal("0")
+    # Sum in integer micro-units: one Decimal->int conversion per line, plain
+    # int arithmetic in the loop, back to a float only at the boundary
+    total_micro = 0
     for l in lines:
         v = get_item_value_at(db, structure_id, l.item_id, ts)
         if v is None:
             return None
-        line_val = v * Decimal(l.quantity)
-        if l.direction == "GAINED":
-            total += line_val
-        else:
-            total -= line_val
-
-    return float(total)
+        line_micro = int(v.scaleb(6)) * l.quantity
+        total_micro += line_micro if l.direction == "GAINED" else -line_micro
+
+    return float(Decimal(total_micro).scaleb(-6))
+
+
+# Per-trade profit as one aggregate: the lateral picks each line's valuation
+# in effect at the trade's timestamp, the CASE folds direction into the sign,
+# and the two counts detect lines with no valuation (profit must be null then)
+_PROFIT_SQL = text("""
+    SELECT tl.trade_id,
+           COUNT(*) AS line_count,
+           COUNT(v.value) AS valued_count,
+           SUM(CASE WHEN tl.direction = 'GAINED' THEN 1 ELSE -1 END
+               * tl.quantity * v.value) AS profit
+    FROM trade_lines tl
+    JOIN trades t ON t.id = tl.trade_id
+    LEFT JOIN LATERAL (
+        SELECT iv.value_in_currency AS value
+        FROM item_values iv
+        WHERE iv.structure_id = :sid
+          AND iv.item_id = tl.item_id
+          AND iv.effective_from <= t.timestamp
+        ORDER BY iv.effective_from DESC
+        LIMIT 1
+    ) v ON true
+    WHERE tl.trade_id IN :trade_ids
+    GROUP BY tl.trade_id
+""").bindparams(bindparam("trade_ids", expanding=True))
+
+
+def _compute_profits_sql(
+    db: Session, structure_id: str, trade_ids: list[int]
+) -> dict[int, float | None]:
+    """Profit for many trades in one query; trades with no lines are absent."""
+    if not trade_ids:
+        return {}
+    rows = db.execute(_PROFIT_SQL, {"sid": structure_id, "trade_ids": trade_ids})
+    return {
+        row.trade_id: float(row.profit) if row.valued_count == row.line_count else None
+        for row in rows
+    }
 
 
 def _line_to_schema(l: TradeLine) -> TradeLineOut:
     """Single place to serialize a trade line (so we don't forget fields)."""
-    return TradeLineOut(
+    # model_construct skips validation; these values come straight from our
+    # own rows, not client input
+    return TradeLineOut.model_construct(
         id=l.id,
         item_id=l.item_id,
         direction=l.direction,
@@ -55,35 +103,42 @@ def _line_to_schema(l: TradeLine) -> TradeLineOut:
     )
 
 
-def _build_trade_out(db: Session, t: Trade) -> TradeOut:
-    # If Trade.lines relationship exists, use it; otherwise fetch
-    lines = getattr(t, "lines", None)
+_UNSET = object()
+
+
+def _build_trade_out(
+    db: Session,
+    t: Trade,
+    lines: list[TradeLine] | None = None,
+    profit=_UNSET,
+) -> TradeOut:
+    # Callers that already hold the lines (eager-loaded or just created) pass
+    # them in; fall back to the relationship otherwise
     if lines is None:
-        lines = db.query(TradeLine).filter_by(trade_id=t.id).all()
+        lines = t.lines
 
-    gained = [l for l in lines if l.direction == "GAINED"]
-    given = [l for l in lines if l.direction == "GIVEN"]
+    # Partition and serialize in one pass instead of two filtered walks
+    gained, given = [], []
+    for l in lines:
+        (gained if l.direction == "GAINED" else given).append(_line_to_schema(l))
 
-    profit = _compute_profit(db, t)
+    # List callers precompute profits for the whole page in one SQL aggregate
+    if profit is _UNSET:
+        profit = _compute_profit(db, t, lines)
 
-    if t.user is not None:
-        username = t.user.username
-    elif hasattr(t, "_username_cache"):
-        username = t._username_cache
-    else:
-        # Fallback: load the user instance then use the property
-        u = db.query(User).filter(User.id == t.user_id).first()
-        username = u.username if u is not None else ""
+    # user_id is non-nullable, so the relationship always resolves; list
+    # callers eager-load it, create resolves from the identity map
+    username = t.user.username if t.user is not None else ""
 
-    return TradeOut(
+    return TradeOut.model_construct(
         id=t.id,
         timestamp=t.timestamp,
         from_location_id=t.from_location_id,
         to_location_id=t.to_location_id,
         user_id=t.user_id,
         username=username,
-        gained=[_line_to_schema(l) for l in gained],
-        given=[_line_to_schema(l) for l in given],
+        gained=gained,
+        given=given,
         profit=profit,
     )
 
@@ -120,6 +175,44 @@ def create_trade(
         validate_header_loc(payload.from_location_id, "from_location_id")
         validate_header_loc(payload.to_location_id, "to_location_id")
 
+        # --- Batch-validate line users and movement reasons: one IN query per
+        # kind instead of up to three SELECTs per line
+        line_user_ids = {
+            uid
+            for ln in payload.lines
+            for uid in (ln.from_user_id, ln.to_user_id)
+            if uid is not None
+        }
+        valid_user_ids = {
+            uid for (uid,) in db.query(User.id).filter(
+                User.id.in_(line_user_ids), User.structure_id == structure_id
+            )
+        } if line_user_ids else set()
+
+        reason_codes = {ln.movement_reason_code for ln in payload.lines if ln.movement_reason_code}
+        valid_reason_codes = {
+            code for (code,) in db.query(MovementReason.code).filter(
+                MovementReason.structure_id == structure_id,
+                MovementReason.code.in_(reason_codes),
+                MovementReason.is_active.is_(True),
+            )
+        } if reason_codes else set()
+
+        # Resolve every referenced location's external flag up front; the
+        # per-line checks below become dict lookups
+        line_loc_ids = {
+            loc_id
+            for ln in payload.lines
+            for loc_id in (
+                ln.from_location_id or payload.from_location_id,
+                ln.to_location_id or payload.to_location_id,
+            )
+            if loc_id is not None
+        }
+        external_map = dict(db.query(Location.id, Location.is_external).filter(
+            Location.id.in_(line_loc_ids), Location.structure_id == structure_id
+        )) if line_loc_ids else {}
+
         # --- Create trade header
         t = Trade(
             structure_id=structure_id,
@@ -131,37 +224,22 @@ def create_trade(
         db.add(t)
         db.flush()  # get t.id
 
+        line_rows: list[dict] = []
         for ln in payload.lines:
             # Resolve header defaults for locations (only when that side is a location)
             from_loc_id = ln.from_location_id or payload.from_location_id
             to_loc_id   = ln.to_location_id   or payload.to_location_id
 
             # Users must be in same structure
-            if ln.from_user_id is not None:
-                u = db.query(User).filter(
-                    User.id == ln.from_user_id,
-                    User.structure_id == structure_id,
-                ).first()
-                if not u:
-                    raise HTTPException(status_code=400, detail="from_user_id not in your structure")
-
-            if ln.to_user_id is not None:
-                u = db.query(User).filter(
-                    User.id == ln.to_user_id,
-                    User.structure_id == structure_id,
-                ).first()
-                if not u:
-                    raise HTTPException(status_code=400, detail="to_user_id not in your structure")
+            if ln.from_user_id is not None and ln.from_user_id not in valid_user_ids:
+                raise HTTPException(status_code=400, detail="from_user_id not in your structure")
+
+            if ln.to_user_id is not None and ln.to_user_id not in valid_user_ids:
+                raise HTTPException(status_code=400, detail="to_user_id not in your structure")
 
             # Movement reason must be valid (if provided)
-            if ln.movement_reason_code:
-                ok = db.query(MovementReason.id).filter(
-                    MovementReason.structure_id == structure_id,
-                    MovementReason.code == ln.movement_reason_code,
-                    MovementReason.is_active.is_(True),
-                ).first()
-                if not ok:
-                    raise HTTPException(status_code=400, detail="Invalid movement_reason_code for structure")
+            if ln.movement_reason_code and ln.movement_reason_code not in valid_reason_codes:
+                raise HTTPException(status_code=400, detail="Invalid movement_reason_code for structure")
 
             # XOR per side (user XOR location), using header defaults for locations
             from_has_user = ln.from_user_id is not None
@@ -176,38 +254,37 @@ def create_trade(
                 raise HTTPException(status_code=400, detail="Provide exactly one TO party (user XOR location; header default counts).")
 
             # Optional: forbid External <-> User combos
-            def is_external(loc_id: int | None) -> bool:
-                if loc_id is None:
-                    return False
-                loc = db.query(Location).filter(
-                    Location.id == loc_id, Location.structure_id == structure_id
-                ).first()
-                return bool(loc and loc.is_external)
-
-            if from_has_loc and is_external(from_loc_id) and to_has_user:
+            if from_has_loc and external_map.get(from_loc_id) and to_has_user:
                 raise HTTPException(status_code=400, detail="External locations cannot trade directly with users (FROM).")
-            if to_has_loc and is_external(to_loc_id) and from_has_user:
+            if to_has_loc and external_map.get(to_loc_id) and from_has_user:
                 raise HTTPException(status_code=400, detail="External locations cannot trade directly with users (TO).")
 
-            # Create line (ensure XOR by nulling the opposite party fields explicitly)
-            db_line = TradeLine(
-                trade_id=t.id,
-                item_id=ln.item_id,
-                direction=ln.direction,
-                quantity=ln.quantity,
-                from_user_id=ln.from_user_id if from_has_user else None,
-                from_location_id=None if from_has_user else from_loc_id,
-                to_user_id=ln.to_user_id if to_has_user else None,
-                to_location_id=None if to_has_user else to_loc_id,
-                movement_reason_code=ln.movement_reason_code,
-            )
-            db.add(db_line)
-
-        db.flush()
+            # Collect line values (ensure XOR by nulling the opposite party
+            # fields explicitly); all lines are inserted in one statement
+            # below instead of one ORM flush per row
+            line_rows.append({
+                "trade_id": t.id,
+                "item_id": ln.item_id,
+                "direction": ln.direction,
+                "quantity": ln.quantity,
+                "from_user_id": ln.from_user_id if from_has_user else None,
+                "from_location_id": None if from_has_user else from_loc_id,
+                "to_user_id": ln.to_user_id if to_has_user else None,
+                "to_location_id": None if to_has_user else to_loc_id,
+                "movement_reason_code": ln.movement_reason_code,
+            })
+
+        # RETURNING hands back the inserted lines with their ids, so the
+        # response can be built without re-selecting anything
+        new_lines = list(
+            db.execute(insert(TradeLine).returning(TradeLine), line_rows).scalars()
+        ) if line_rows else []
         apply_user_ledgers_and_inventory(db, t)
+        # Build the response while the instances are still live; committing
+        # first would expire them and force a refresh SELECT
+        out = _build_trade_out(db, t, new_lines)
         db.commit()
-        db.refresh(t)
-        return _build_trade_out(db, t)
+        return out
 
     except HTTPException:
         db.rollback()
@@ -217,14 +294,34 @@ def create_trade(
         raise HTTPException(status_code=500, detail="Failed to create trade") from e
 
 
-@router.get("", response_model=list[TradeOut])
+def _encode_trade_cursor(ts: datetime, trade_id: int) -> str:
+    raw = f"{ts.isoformat()}|{trade_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_trade_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts_raw, id_raw = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(ts_raw), int(id_raw)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("", response_model=TradePage)
 def list_trades(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Eager-load user; lines are fetched inside _build_trade_out (safe),
-    # or you can add joinedload(Trade.lines) if relationship exists.
-    q = db.query(Trade).options(joinedload(Trade.user)).filter(
+    # Eager-load user and all lines up front; _build_trade_out previously
+    # re-queried trade_lines twice per trade (once for the payload, once for
+    # profit), i.e. 2N queries per page. selectinload on the user keeps the
+    # trade rows narrow and fetches the page's distinct users in one IN query.
+    q = db.query(Trade).options(
+        selectinload(Trade.user).load_only(User.id, User.username),
+        selectinload(Trade.lines),
+    ).filter(
         Trade.structure_id == current_user.structure_id
     )
     can_view_all = has_perm(current_user, "trades.view_all")
@@ -241,8 +338,28 @@ def list_trades(
                     ),
             )),
         ))
-    trades = q.order_by(Trade.timestamp.desc()).all()
-    return [_build_trade_out(db, t) for t in trades]
+    # Keyset pagination on (timestamp, id): the composite cursor matches the
+    # ORDER BY, so trades sharing a boundary timestamp aren't skipped when a
+    # page break falls between them
+    if cursor is not None:
+        after_ts, after_id = _decode_trade_cursor(cursor)
+        q = q.filter(tuple_(Trade.timestamp, Trade.id) < (after_ts, after_id))
+    trades = q.order_by(Trade.timestamp.desc(), Trade.id.desc()).limit(limit).all()
+
+    # One aggregate query prices the whole page; absent trades have no lines,
+    # whose profit is 0 by definition
+    profits = _compute_profits_sql(db, current_user.structure_id, [t.id for t in trades])
+
+    page = TradePage.model_construct(
+        items=[_build_trade_out(db, t, t.lines, profits.get(t.id, 0.0)) for t in trades],
+        next_cursor=(
+            _encode_trade_cursor(trades[-1].timestamp, trades[-1].id)
+            if len(trades) == limit else None
+        ),
+    )
+    # Returning a Response keeps response_model for the docs but hands
+    # FastAPI finished bytes
+    return Response(_TRADE_PAGE_ADAPTER.dump_json(page), media_type="application/json")
 
 
 @router.delete("/trade-lines/{line_id}")
@@ -276,9 +393,10 @@ def delete_trade_line(
         db.delete(tl)
         db.flush()
 
-        remaining = db.query(TradeLine.id).filter(TradeLine.trade_id == trade_id).count()
+        # EXISTS stops at the first surviving line; COUNT(*) scanned them all
+        any_left = db.query(exists().where(TradeLine.trade_id == trade_id)).scalar()
         deleted_trade = False
-        if remaining == 0:
+        if not any_left:
             db.delete(tr)
             deleted_trade = True
 
@@ -14,13 +14,20 @@ def _role_in_structure(db: Session, structure_id: str, role_id: int) -> Role | N
     return db.query(Role).filter_by(id=role_id, structure_id=structure_id).first()
 
 def _to_user_out(u: User) -> UserOut:
-    return UserOut(
+    # One walk over the roles instead of three comprehensions
+    role_ids, role_types, role_names = [], [], []
+    for r in u.roles:
+        role_ids.append(r.id)
+        role_types.append(r.role_type)
+        role_names.append(r.name)
+    # model_construct skips validation; everything here comes from our own rows
+    return UserOut.model_construct(
         id=u.id,
         username=u.username,
         structure_id=u.structure_id,
-        role_ids=[r.id for r in u.roles],
-        role_codes=[r.code for r in u.roles],
-        role_names=[r.name for r in u.roles],
+        role_ids=role_ids,
+        role_types=role_types,
+        role_names=role_names,
     )
 
 
@@ -49,14 +56,7 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db),
     db.commit();
     db.refresh(new_user)
 
-    return UserOut(
-        id=new_user.id,
-        username=new_user.username,
-        structure_id=new_user.structure_id,
-        role_ids=[r.id for r in new_user.roles],
-        role_codes=[r.code for r in new_user.roles],
-        role_names=[r.name for r in new_user.roles],
-    )
+    return _to_user_out(new_user)
 
 @router.get("", response_model=list[UserOut])
 def list_users(db: Session = Depends(get_db),
@@ -68,16 +68,7 @@ def list_users(db: Session = Depends(get_db),
         .order_by(User.username.asc())
         .all()
     )
-    return [
-        UserOut(
-            id=u.id,
-            username=u.username,
-            structure_id=u.structure_id,
-            role_ids=[r.id for r in u.roles],
-            role_codes=[r.code for r in u.roles],
-            role_names=[r.name for r in u.roles],
-        ) for u in users
-    ]
+    return [_to_user_out(u) for u in users]
 
 
 @router.patch("/{user_id}/roles", response_model=UserOut)
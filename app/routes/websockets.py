@@ -3,9 +3,11 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends
 from sqlalchemy.orm import Session, joinedload
 from jose import JWTError
 import logging
-import json
+import orjson
 import asyncio
 from datetime import datetime, timezone
+from time import time
+from typing import Dict, Tuple
 
 from app.services.deps import get_db
 from app.services.websocket_manager import WebSocketManager
@@ -18,18 +20,44 @@ logger.setLevel(logging.INFO)
 router = APIRouter(tags=["websocket"])
 
 
+# Reconnect-heavy MC clients present the same token on every handshake; cache
+# the decode result briefly so signature verification isn't redone each time.
+# Entries never outlive the token's own exp claim.
+_TOKEN_TTL_SECONDS = 60
+_TOKEN_CACHE_MAX = 4096
+_token_cache: Dict[str, Tuple[int, float]] = {}  # token -> (user_id, cache expiry)
+
+
+def _decode_user_id(token: str) -> int:
+    now = time()
+    cached = _token_cache.get(token)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    payload = decode_jwt_token(token)
+    sub = payload.get("sub")
+    if sub is None:
+        raise ValueError("Token missing 'sub' claim")
+    user_id = int(sub)
+
+    expires = now + _TOKEN_TTL_SECONDS
+    exp = payload.get("exp")
+    if exp is not None:
+        expires = min(expires, float(exp))
+    if len(_token_cache) >= _TOKEN_CACHE_MAX:
+        # Bound memory under floods of one-shot tokens
+        _token_cache.clear()
+    _token_cache[token] = (user_id, expires)
+    return user_id
+
+
 def validate_token_and_get_user(token: str, db: Session) -> User:
     """
     Validate JWT token and return the associated user.
     Raises HTTPException if invalid.
     """
     try:
-        payload = decode_jwt_token(token)
-        sub = payload.get("sub")
-        if sub is None:
-            raise ValueError("Token missing 'sub' claim")
-
-        user_id = int(sub)
+        user_id = _decode_user_id(token)
     except (JWTError, ValueError) as e:
         logger.error(f"Invalid token: {e}")
         raise ValueError(f"Invalid token: {e}")
@@ -84,6 +112,7 @@ async def websocket_endpoint(
     # Accept the WebSocket connection
     await websocket.accept()
 
+    ping_task = None
     try:
         # Register connection in manager
         await manager.register(websocket, user)
@@ -95,38 +124,28 @@ async def websocket_endpoint(
             "username": user.username,
             "structure_id": user.structure_id
         }
-        await websocket.send_json(welcome_message)
+        await websocket.send_text(orjson.dumps(welcome_message).decode())
 
-        # Main message loop with periodic ping
+        # Heartbeat runs as its own task so the receive loop below has no
+        # per-iteration timeout arithmetic or event-loop lookups
         ping_interval = 30.0  # seconds
-        last_ping_time = asyncio.get_event_loop().time()
 
-        while True:
-            # Calculate time until next ping
-            current_time = asyncio.get_event_loop().time()
-            time_since_last_ping = current_time - last_ping_time
-            timeout = max(0.1, ping_interval - time_since_last_ping)
-
-            try:
-                # Wait for message with timeout
-                message_text = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=timeout
-                )
-
-                # Handle received message
-                await handle_client_message(message_text, user, manager)
-
-            except asyncio.TimeoutError:
-                # Timeout reached, send ping
+        async def ping_sender() -> None:
+            while True:
+                await asyncio.sleep(ping_interval)
                 ping_message = {
                     "type": "ping",
                     "timestamp": datetime.now(timezone.utc).isoformat()
                 }
-                await websocket.send_json(ping_message)
-                last_ping_time = asyncio.get_event_loop().time()
+                await websocket.send_text(orjson.dumps(ping_message).decode())
                 logger.debug(f"Sent ping to user {user.id}")
 
+        ping_task = asyncio.create_task(ping_sender())
+
+        while True:
+            message_text = await websocket.receive_text()
+            await handle_client_message(message_text, user, manager)
+
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected normally for user {user.id}")
 
@@ -135,6 +154,8 @@ async def websocket_endpoint(
 
     finally:
         # Cleanup on disconnect
+        if ping_task is not None:
+            ping_task.cancel()
         if user:
             await manager.unregister(user.id)
 
@@ -148,7 +169,7 @@ async def handle_client_message(message_text: str, user: User, manager: WebSocke
     - ack: Acknowledgment of received messages
     """
     try:
-        message = json.loads(message_text)
+        message = orjson.loads(message_text)
         message_type = message.get("type")
 
         if message_type == "pong":
@@ -165,7 +186,7 @@ async def handle_client_message(message_text: str, user: User, manager: WebSocke
         else:
             logger.warning(f"Unknown message type from user {user.id}: {message_type}")
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON from user {user.id}: {e}")
     except Exception as e:
         logger.error(f"Error handling message from user {user.id}: {e}", exc_info=True)
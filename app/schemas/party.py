@@ -12,6 +12,11 @@ class PartyOut(PartyIn):
     created_by_user_id: int
     class Config: from_attributes = True
 
+class PartyDetailOut(PartyOut):
+    leader_user_id: Optional[int] = None
+    leader_username: Optional[str] = None
+    members_count: int = 0
+
 class PartyListOut(BaseModel):
     id: int
     name: str
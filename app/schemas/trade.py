@@ -66,6 +66,11 @@ class TradeOut(BaseModel):
     given: List[TradeLineOut]
     profit: Optional[float] = None
 
+class TradePage(BaseModel):
+    items: List[TradeOut]
+    # Opaque; pass back as ?cursor= to fetch the next (older) page; null on the last page
+    next_cursor: Optional[str] = None
+
 class TradeItem(BaseModel):
     name: str
     quantity: int
@@ -20,7 +20,7 @@ class UserOut(BaseModel):
     username: str
     structure_id: str
     role_ids: List[int]
-    role_codes: List[Optional[str]] = []
+    role_types: List[Optional[str]] = []
     role_names: List[Optional[str]] = []
     class Config: from_attributes = True
 
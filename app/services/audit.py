@@ -1,9 +1,10 @@
 # app/services/audit.py
 from sqlalchemy.orm import Session
-from app.models.auth_audit_log import AuthAuditLog
 from typing import Optional, Dict, Any
 from fastapi import Request
 
+from app.services import audit_queue
+
 
 def log_auth_event(
     db: Session,
@@ -12,20 +13,21 @@ def log_auth_event(
     mc_uuid: Optional[str] = None,
     request: Optional[Request] = None,
     metadata: Optional[Dict[str, Any]] = None
-) -> AuthAuditLog:
+) -> None:
     """
     Log an authentication event to the audit log.
 
+    Events are queued and written in the background in batches, so the
+    caller's transaction no longer carries the audit INSERT. The db
+    parameter is kept for call-site compatibility but is not used.
+
     Args:
-        db: Database session
+        db: Database session (unused; writes go through the audit queue)
         event_type: Type of event (magic_link_request, magic_login, password_set, login_success, login_failed, etc.)
         user_id: User ID (if known)
         mc_uuid: Minecraft UUID (if applicable)
         request: FastAPI request object (to extract IP and user agent)
         metadata: Additional metadata as dict
-
-    Returns:
-        AuthAuditLog: The created log entry
     """
     ip_address = None
     user_agent = None
@@ -39,16 +41,11 @@ def log_auth_event(
         # Extract user agent
         user_agent = request.headers.get("user-agent")
 
-    log_entry = AuthAuditLog(
-        user_id=user_id,
-        event_type=event_type,
-        mc_uuid=mc_uuid,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        event_metadata=metadata or {}
-    )
-
-    db.add(log_entry)
-    db.flush()  # Get the ID without committing
-
-    return log_entry
+    audit_queue.enqueue({
+        "user_id": user_id,
+        "event_type": event_type,
+        "mc_uuid": mc_uuid,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "event_metadata": metadata or {},
+    })
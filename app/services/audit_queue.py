@@ -0,0 +1,108 @@
+# app/services/audit_queue.py
+import asyncio
+import contextlib
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.models.auth_audit_log import AuthAuditLog
+
+logger = logging.getLogger("bookkeeper.audit")
+logger.setLevel(logging.INFO)
+
+# Flush whenever this many events are pending, or after this many ms of
+# accumulation, whichever comes first
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_BATCH_MS = int(os.getenv("AUDIT_BATCH_MS", "500"))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+
+_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=AUDIT_QUEUE_MAX)
+_drain_task: Optional[asyncio.Task] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _put(row: Dict[str, Any]) -> None:
+    # Runs on the event loop thread (via call_soon_threadsafe)
+    try:
+        _queue.put_nowait(row)
+    except asyncio.QueueFull:
+        # Audit must never take the request down with it
+        logger.warning("audit queue full; dropping event %s", row.get("event_type"))
+
+
+def enqueue(row: Dict[str, Any]) -> None:
+    """Queue an audit event for background insertion (non-blocking).
+
+    Callers are usually sync routes on threadpool threads and asyncio.Queue
+    is not thread-safe, so the actual put is marshalled onto the event loop.
+    """
+    # Stamp the event time here; the row is written later
+    row.setdefault("created_at", datetime.now(timezone.utc))
+    if _loop is None or _loop.is_closed():
+        logger.warning("audit queue not running; dropping event %s", row.get("event_type"))
+        return
+    _loop.call_soon_threadsafe(_put, row)
+
+
+def _flush(rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    db = SessionLocal()
+    try:
+        # Core insert lets SQLAlchemy batch the whole list into multi-row
+        # VALUES statements (insertmanyvalues) — one round trip for the
+        # batch instead of per-row executes
+        db.execute(insert(AuthAuditLog), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("failed to flush %d audit events", len(rows))
+    finally:
+        db.close()
+
+
+async def _drain() -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        # Block for the first event, then batch up whatever arrives within
+        # the window
+        rows = [await _queue.get()]
+        deadline = loop.time() + AUDIT_BATCH_MS / 1000.0
+        while len(rows) < AUDIT_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(await asyncio.wait_for(_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # The insert is sync DB I/O; keep it off the event loop
+        await asyncio.to_thread(_flush, rows)
+
+
+def start() -> None:
+    """Start the background drain task (idempotent; call from startup)."""
+    global _drain_task, _loop
+    if _drain_task is None or _drain_task.done():
+        _loop = asyncio.get_running_loop()
+        _drain_task = _loop.create_task(_drain())
+        logger.info("audit queue drain task started")
+
+
+async def shutdown() -> None:
+    """Stop the drain task and flush anything still queued."""
+    global _drain_task
+    if _drain_task is not None:
+        _drain_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _drain_task
+        _drain_task = None
+
+    rows: List[Dict[str, Any]] = []
+    while not _queue.empty():
+        rows.append(_queue.get_nowait())
+    await asyncio.to_thread(_flush, rows)
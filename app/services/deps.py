@@ -1,6 +1,6 @@
 import logging
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
 
@@ -13,6 +13,16 @@ logger.setLevel(logging.INFO)
 
 oauth2_scheme = HTTPBearer()
 
+# Role types that grant blanket admin access within a structure
+_ADMIN_ROLE_TYPES = frozenset(("OWNER", "ADMIN"))
+
+# Structure role ranking used by has_structure_permission
+ROLE_HIERARCHY = {"OWNER": 3, "ADMIN": 2, "MEMBER": 1}
+
+# One plain session per request: FastAPI runs sync dependencies and their
+# teardown on arbitrary pooled threads, so a thread-scoped registry could hand
+# overlapping requests the same live session. Connection reuse comes from the
+# engine pool, not session scoping.
 def get_db():
     db = SessionLocal()
     try:
@@ -34,26 +44,45 @@ def get_current_user(
     except (JWTError, ValueError):
         raise HTTPException(401, "Invalid token")
 
-    # Eager-load role for permission checks
+    # Eager-load roles for permission checks
     user = (
         db.query(User)
-        .options(joinedload(User.roles))
+        .options(selectinload(User.roles))
         .filter(User.id == user_id)
         .first()
     )
     if not user:
         raise HTTPException(404, "User not found")
+    # Precompute the admin flag and effective permission set once per request
+    # so handlers don't re-scan the roles collection for every check.
+    user.is_admin = any(r.role_type in _ADMIN_ROLE_TYPES for r in user.roles)
+    user._perms = _effective_perms(user)
+    user._max_role_level = max(
+        (ROLE_HIERARCHY.get(r.role_type, 0) for r in user.roles), default=0
+    )
     return user
 
 def get_current_structure(user: User = Depends(get_current_user)) -> str:
     return user.structure_id
 
+def _effective_perms(user: User) -> frozenset:
+    # flatten the per-role permission dicts into one set of granted perms
+    return frozenset(
+        p
+        for r in (user.roles or [])
+        if r.permissions
+        for p, granted in r.permissions.items()
+        if granted
+    )
+
 def has_perm(user: User, perm: str) -> bool:
-    # any role that has perm true
-    for r in (user.roles or []):
-        if r.permissions and r.permissions.get(perm, False):
-            return True
-    return False
+    # O(1) set membership on the precomputed permission set; fall back to
+    # computing it for User objects that didn't pass through get_current_user
+    perms = getattr(user, "_perms", None)
+    if perms is None:
+        perms = _effective_perms(user)
+        user._perms = perms
+    return perm in perms
 
 def require_perm(perm: str):
     def _inner(user: User = Depends(get_current_user)):
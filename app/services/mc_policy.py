@@ -2,6 +2,7 @@
 from __future__ import annotations
 from typing import Dict, Tuple
 from time import time
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from app.models.message_position_policy import MessagePositionPolicy
 
@@ -50,3 +51,19 @@ def get_position(db: Session, structure_id: str, kind: str) -> str:
 
 def invalidate(structure_id: str, kind: str) -> None:
     _cache.pop((structure_id, kind.upper()), None)
+
+
+def _invalidate_for_row(mapper, connection, target: MessagePositionPolicy) -> None:
+    # A global default (structure_id NULL) can back any structure's cached
+    # entry, so drop everything; a structure override only affects its own key.
+    if target.structure_id is None:
+        _cache.clear()
+    else:
+        invalidate(target.structure_id, target.kind)
+
+
+# Keep the TTL cache coherent with writes so policy edits show up on the next
+# poll instead of after the TTL lapses.
+event.listen(MessagePositionPolicy, "after_insert", _invalidate_for_row)
+event.listen(MessagePositionPolicy, "after_update", _invalidate_for_row)
+event.listen(MessagePositionPolicy, "after_delete", _invalidate_for_row)
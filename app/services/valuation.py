@@ -1,16 +1,30 @@
 from decimal import Decimal
 from datetime import datetime, timezone
+from time import time
+from typing import Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from app.models.structure_settings import StructureSettings
 from app.models.item_value import ItemValue
 from app.models.item import Item
 
+# Valuation history is append-only, so a short-TTL cache on point lookups is
+# safe: a new valuation row is picked up within the TTL, existing rows never
+# change. Keyed on the minute bucket so nearby timestamps share an entry.
+_VALUE_TTL_SECONDS = 300
+_VALUE_CACHE_MAX = 50_000
+_value_cache: Dict[Tuple[str, int, datetime], Tuple[Optional[Decimal], float]] = {}
+
 def get_currency_item_for_structure(db: Session, structure_id: str):
     ss = db.query(StructureSettings).filter(StructureSettings.structure_id == structure_id).first()
     return ss.currency_item_id if ss and ss.currency_item_id else None
 
 def get_item_value_at(db: Session, structure_id: str, item_id: int, at: datetime) -> Decimal | None:
+    key = (structure_id, item_id, at.replace(second=0, microsecond=0))
+    cached = _value_cache.get(key)
+    if cached and cached[1] > time():
+        return cached[0]
+
     row = (
         db.query(ItemValue)
         .filter(
@@ -21,9 +35,13 @@ def get_item_value_at(db: Session, structure_id: str, item_id: int, at: datetime
         .order_by(ItemValue.effective_from.desc())
         .first()
     )
-    if not row:
-        return None
-    return Decimal(row.value_in_currency)
+    value = Decimal(row.value_in_currency) if row else None
+
+    if len(_value_cache) >= _VALUE_CACHE_MAX:
+        # Crude but cheap bound: drop everything rather than track recency
+        _value_cache.clear()
+    _value_cache[key] = (value, time() + _VALUE_TTL_SECONDS)
+    return value
 
 def value_of_item(db: Session, structure_id: str, item_id: int, qty: int, at: datetime) -> Decimal | None:
     v = get_item_value_at(db, structure_id, item_id, at)
@@ -4,7 +4,7 @@ from typing import Dict, Set, Optional
 from datetime import datetime, timezone
 from fastapi import WebSocket
 import logging
-import json
+import orjson
 
 from app.models.user import User
 
@@ -108,13 +108,17 @@ class WebSocketManager:
         Send a message to a specific user's WebSocket.
         Returns True if sent successfully, False if user not connected.
         """
+        return await self._send_text(user_id, orjson.dumps(message, default=str).decode())
+
+    async def _send_text(self, user_id: int, text: str) -> bool:
+        """Send pre-serialized JSON; broadcasts serialize once for all recipients."""
         if user_id not in self.connections:
             return False
 
         conn_info = self.connections[user_id]
 
         try:
-            await conn_info.websocket.send_json(message)
+            await conn_info.websocket.send_text(text)
             conn_info.last_activity = datetime.now(timezone.utc)
             return True
         except Exception as e:
@@ -133,10 +137,11 @@ class WebSocketManager:
             return 0
 
         user_ids = list(self.structure_index[structure_id])  # Copy to avoid modification during iteration
+        text = orjson.dumps(message, default=str).decode()
         sent_count = 0
 
         for user_id in user_ids:
-            success = await self.send_to_user(user_id, message)
+            success = await self._send_text(user_id, text)
             if success:
                 sent_count += 1
 
@@ -149,10 +154,11 @@ class WebSocketManager:
         Returns count of successful deliveries.
         """
         user_ids = list(self.connections.keys())  # Copy to avoid modification during iteration
+        text = orjson.dumps(message, default=str).decode()
         sent_count = 0
 
         for user_id in user_ids:
-            success = await self.send_to_user(user_id, message)
+            success = await self._send_text(user_id, text)
             if success:
                 sent_count += 1
 
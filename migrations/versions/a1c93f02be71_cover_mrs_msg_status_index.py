@@ -0,0 +1,37 @@
+"""cover mrs msg status index
+
+Revision ID: a1c93f02be71
+Revises: 779bb31f1388
+Create Date: 2025-08-29 10:12:41.102934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c93f02be71'
+down_revision: Union[str, Sequence[str], None] = '779bb31f1388'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Recreate (message_id, status) with user_id as an INCLUDE column so the
+    # outbox GROUP BY aggregates can run as an index-only scan.
+    op.drop_index('ix_mrs_msg_status', table_name='message_recipient_status')
+    op.create_index(
+        'ix_mrs_msg_status',
+        'message_recipient_status',
+        ['message_id', 'status'],
+        unique=False,
+        postgresql_include=['user_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mrs_msg_status', table_name='message_recipient_status')
+    op.create_index('ix_mrs_msg_status', 'message_recipient_status', ['message_id', 'status'], unique=False)
@@ -0,0 +1,35 @@
+"""role lower name uidx
+
+Revision ID: a7b3e590d1c6
+Revises: f5a2d917cc48
+Create Date: 2025-08-29 13:27:51.904172
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b3e590d1c6'
+down_revision: Union[str, Sequence[str], None] = 'f5a2d917cc48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Case-insensitive role name uniqueness per structure, enforced in the DB
+    # so create_role/update_role can stop pre-checking with lower(name)
+    # SELECTs that no plain index can serve.
+    op.create_index(
+        'ux_roles_struct_lname',
+        'roles',
+        ['structure_id', sa.text('lower(name)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_roles_struct_lname', table_name='roles')
@@ -0,0 +1,36 @@
+"""partial mrs pending index
+
+Revision ID: b7d4512c90ae
+Revises: a1c93f02be71
+Create Date: 2025-08-29 10:31:17.482210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4512c90ae'
+down_revision: Union[str, Sequence[str], None] = 'a1c93f02be71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tiny partial index for the pull_messages existence probe: only rows that
+    # are still deliverable are indexed, so the empty-poll fast path is a
+    # single index-only lookup.
+    op.create_index(
+        'ix_mrs_user_status_pending',
+        'message_recipient_status',
+        ['user_id', 'status'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('QUEUED', 'FAILED')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mrs_user_status_pending', table_name='message_recipient_status')
@@ -0,0 +1,43 @@
+"""hot filter indexes
+
+Revision ID: b9c4e17d3a25
+Revises: a7b3e590d1c6
+Create Date: 2025-08-29 13:02:18.554172
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9c4e17d3a25'
+down_revision: Union[str, Sequence[str], None] = 'a7b3e590d1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # list_trades filters by structure and walks newest-first; the single
+    # column indexes can't serve that order without a sort step.
+    op.create_index(
+        'ix_trade_struct_ts',
+        'trades',
+        ['structure_id', sa.text('timestamp DESC')],
+    )
+    # Member counts and guest listings filter on both columns together.
+    op.create_index(
+        'ix_user_struct_status',
+        'users',
+        ['structure_id', 'membership_status'],
+    )
+    # trade_lines(trade_id) is already the leading column of
+    # ix_trade_lines_item_trade, join codes are unique on code, and movement
+    # reasons are unique on (structure_id, code) — no extra indexes needed.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_struct_status', table_name='users')
+    op.drop_index('ix_trade_struct_ts', table_name='trades')
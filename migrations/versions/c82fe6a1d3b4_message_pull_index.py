@@ -0,0 +1,36 @@
+"""message pull index
+
+Revision ID: c82fe6a1d3b4
+Revises: b7d4512c90ae
+Create Date: 2025-08-29 10:47:55.910662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c82fe6a1d3b4'
+down_revision: Union[str, Sequence[str], None] = 'b7d4512c90ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Matches the pull_messages filter + ORDER BY (priority DESC, id ASC) so
+    # the planner can read pre-sorted tuples instead of sorting after the
+    # filter. deliver_after/expires_at use now() and cannot go in a partial
+    # predicate; they stay as filter conditions on the scan.
+    op.create_index(
+        'ix_message_pull',
+        'messages',
+        ['structure_id', sa.text('priority DESC'), 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_pull', table_name='messages')
@@ -0,0 +1,35 @@
+"""party lower name uidx
+
+Revision ID: d19c4b7e82f5
+Revises: c82fe6a1d3b4
+Create Date: 2025-08-29 11:02:33.271849
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd19c4b7e82f5'
+down_revision: Union[str, Sequence[str], None] = 'c82fe6a1d3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Case-insensitive uniqueness for party names, enforced by the DB so the
+    # routes can drop their lower(name) pre-check SELECTs (which could not use
+    # an index) and rely on IntegrityError instead.
+    op.create_index(
+        'party_structure_lower_name_uidx',
+        'parties',
+        ['structure_id', sa.text('lower(name)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('party_structure_lower_name_uidx', table_name='parties')
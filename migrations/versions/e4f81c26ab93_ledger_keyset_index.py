@@ -0,0 +1,34 @@
+"""ledger keyset index
+
+Revision ID: e4f81c26ab93
+Revises: d19c4b7e82f5
+Create Date: 2025-08-29 11:41:07.554312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f81c26ab93'
+down_revision: Union[str, Sequence[str], None] = 'd19c4b7e82f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Supports the player ledger keyset pagination: the (timestamp, id) seek
+    # and ORDER BY timestamp DESC, id DESC become a single backward index
+    # scan per user/structure.
+    op.create_index(
+        'ix_pil_user_struct_time_id',
+        'player_inventory_ledger',
+        ['user_id', 'structure_id', 'timestamp', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pil_user_struct_time_id', table_name='player_inventory_ledger')
@@ -0,0 +1,29 @@
+"""profile minecraft username
+
+Revision ID: e6d29a51f7b3
+Revises: b9c4e17d3a25
+Create Date: 2025-08-29 16:41:07.284915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6d29a51f7b3'
+down_revision: Union[str, Sequence[str], None] = 'b9c4e17d3a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The magic-auth redesign recreated user_profiles without this column,
+    # but the model (and the MC-name lookups) expect it.
+    op.add_column('user_profiles', sa.Column('minecraft_username', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_profiles', 'minecraft_username')
@@ -0,0 +1,35 @@
+"""unassigned players index
+
+Revision ID: f5a2d917cc48
+Revises: e4f81c26ab93
+Create Date: 2025-08-29 12:09:44.118263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a2d917cc48'
+down_revision: Union[str, Sequence[str], None] = 'e4f81c26ab93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partial index matching the unassigned-players listing: only the small
+    # unassigned slice is indexed, in the (created_at DESC, id DESC) order the
+    # keyset pagination walks.
+    op.create_index(
+        'ix_users_unassigned_created',
+        'users',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text("structure_id IS NULL OR membership_status = 'unassigned'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_unassigned_created', table_name='users')